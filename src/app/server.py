@@ -12,6 +12,8 @@ import pandas as pd
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
 from src.scraping.build_corpus import main as build_corpus_main
+from src.scraping.functions import locked_links_file, write_links_atomic, normalize_url
+from src.common.corpus_store import CorpusStore, has_store
 from src.preprocessing.clean_corpus import main as clean_corpus_main
 from src.lexicale_analysis.compare_corpora import run_all as run_lexical_analysis
 from src.semantic_analysis.run_semantic import run_semantic
@@ -138,44 +140,55 @@ async def get_links():
         total_ukraine=len(ukraine_links)
     )
 
+# handlers synchrones (def) : FastAPI les exécute dans son pool de threads.
+# locked_links_file attend le verrou en dormant, ce qui bloquerait la boucle
+# d'événements pendant tout un run de scraping
 @app.post("/api/links/add")
-async def add_link(corpus: str, url: str):
+def add_link(corpus: str, url: str):
     if corpus not in ["gaza", "ukraine"]:
         raise HTTPException(status_code=400, detail="Corpus invalide. Utilisez 'gaza' ou 'ukraine'")
     
     filepath = f"data/{corpus}_links.txt"
+    other = "ukraine" if corpus == "gaza" else "gaza"
+    # le lien est gardé tel quel ; une variante (suivi, AMP, www...) d'un lien
+    # connu est un doublon
+    url = url.strip()
+    key = normalize_url(url)
     
     try:
-        existing_links = read_links_file(filepath)
-        if url in existing_links:
-            raise HTTPException(status_code=400, detail="Ce lien existe déjà")
-        
-        with open(filepath, 'a', encoding='utf-8') as f:
-            f.write(url + '\n')
+        # même verrou que le scraping, qui réécrit ce fichier en fin de run
+        with locked_links_file(filepath):
+            existing_links = read_links_file(filepath)
+            if key in {normalize_url(l) for l in existing_links}:
+                raise HTTPException(status_code=400, detail="Ce lien existe déjà")
+            
+            write_links_atomic(filepath, existing_links + [url])
         
-        return {"status": "success", "message": f"Lien ajouté à {corpus}"}
+        message = f"Lien ajouté à {corpus}"
+        if key in {normalize_url(l) for l in read_links_file(f"data/{other}_links.txt")}:
+            message += f" (attention : il figure aussi dans {other})"
+        return {"status": "success", "message": message}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/links/remove")
-async def remove_link(corpus: str, url: str):
+def remove_link(corpus: str, url: str):
     if corpus not in ["gaza", "ukraine"]:
         raise HTTPException(status_code=400, detail="Corpus invalide. Utilisez 'gaza' ou 'ukraine'")
     
     filepath = f"data/{corpus}_links.txt"
     
     try:
-        links = read_links_file(filepath)
-        if url not in links:
-            raise HTTPException(status_code=404, detail="Lien non trouvé")
-        
-        links.remove(url)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            for link in links:
-                f.write(link + '\n')
+        with locked_links_file(filepath):
+            links = read_links_file(filepath)
+            # le lien exact ou une de ses variantes
+            matching = [l for l in links if l == url or normalize_url(l) == normalize_url(url)]
+            if not matching:
+                raise HTTPException(status_code=404, detail="Lien non trouvé")
+            
+            write_links_atomic(filepath, [l for l in links if l not in matching])
         
         return {"status": "success", "message": f"Lien supprimé de {corpus}"}
     except HTTPException:
@@ -233,33 +246,35 @@ async def get_corpus_texts(corpus: str = "gaza", limit: int = 10, offset: int =
     
     corpus_dir = f"data/raw_text/{corpus}"
     
-    if not os.path.exists(corpus_dir):
+    if not has_store(corpus_dir):
         return {"status": "success", "data": {"texts": [], "total": 0}}
     
-    files = [f for f in os.listdir(corpus_dir) if f.endswith('.txt') and f != '_stats.json']
-    files = sorted(files)
+    # index relu à chaque requête (le corpus peut être reconstruit en tâche de
+    # fond) ; accès direct par id : seuls les articles de la page sont décompressés
+    store = CorpusStore(corpus_dir)
+    ids = sorted(store.ids())
     if offset < 0:
         offset = 0
     texts = []
     
-    for i, filename in enumerate(files[offset: offset + limit]):
+    for doc_id in ids[offset: offset + limit]:
         try:
-            with open(os.path.join(corpus_dir, filename), 'r', encoding='utf-8') as f:
-                content = f.read()
-                texts.append({
-                    "id": filename.replace('.txt', ''),
-                    "filename": filename,
-                    "preview": content[:500] + "..." if len(content) > 500 else content,
-                    "word_count": len(content.split())
-                })
+            content = store.get(doc_id)["text"]
+            texts.append({
+                "id": doc_id,
+                "filename": f"{doc_id}.txt",
+                "preview": content[:500] + "..." if len(content) > 500 else content,
+                "word_count": len(content.split())
+            })
         except Exception as e:
-            print(f"Erreur lecture {filename}: {e}")
+            print(f"Erreur lecture {doc_id}: {e}")
+    store.close()
     
     return {
         "status": "success",
         "data": {
             "texts": texts,
-            "total": len(files),
+            "total": len(ids),
             "showing": len(texts),
             "offset": offset,
             "limit": limit
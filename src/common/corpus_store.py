@@ -0,0 +1,321 @@
+import os
+import json
+import zlib
+import threading
+from glob import glob
+
+SHARD_MAX_BYTES = 64 * 1024 * 1024
+INDEX_NAME = "_index.json"
+SHARD_SUFFIX = ".jsonl.gz"
+
+
+def _compress(entry):
+    # un membre gzip par enregistrement : lisible seul (accès par id) et la
+    # concaténation reste un .jsonl.gz valide (zcat, pandas...)
+    comp = zlib.compressobj(6, zlib.DEFLATED, 31)
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+    return comp.compress(line) + comp.flush()
+
+
+def _decompress(blob):
+    return json.loads(zlib.decompress(blob, 31).decode("utf-8"))
+
+
+class CorpusStore:
+    """Stockage d'articles en shards JSONL compressés (gzip), append-only.
+
+    Chaque écriture ajoute un enregistrement à la fin du shard courant ;
+    _index.json donne pour chaque id [shard, offset, taille, version], ce qui
+    permet de lire un article sans décompresser le reste du shard. Une
+    réécriture ou une suppression laisse l'ancien enregistrement en place
+    (espace mort récupéré par compact()). Les enregistrements écrits après la
+    dernière sauvegarde de l'index sont relus au chargement (run interrompu).
+    Un seul processus écrit dans un store à la fois ; un lecteur qui ouvre
+    son propre CorpusStore ne modifie jamais les fichiers tant qu'il
+    n'appelle pas flush().
+    """
+
+    def __init__(self, path, shard_max_bytes=SHARD_MAX_BYTES):
+        self.path = path
+        self.shard_max_bytes = shard_max_bytes
+        self.index = {}
+        self.version = 0
+        self.sizes = {}
+        self._lock = threading.RLock()
+        self._writer = None
+        self._readers = {}
+        self._dirty = False
+        os.makedirs(path, exist_ok=True)
+        self._load()
+        self._stamp = self._disk_stamp()
+
+    # ---------- index ----------
+
+    def _index_path(self):
+        return os.path.join(self.path, INDEX_NAME)
+
+    def _disk_stamp(self):
+        # mtime de l'index et taille des shards : change quand un autre
+        # processus écrit, reconstruit ou compacte le store
+        try:
+            index_mtime = os.stat(self._index_path()).st_mtime_ns
+        except OSError:
+            index_mtime = None
+        shards = glob(os.path.join(self.path, "*" + SHARD_SUFFIX))
+        return index_mtime, tuple(sorted((os.path.basename(p), os.path.getsize(p)) for p in shards))
+
+    def is_stale(self):
+        # fichiers modifiés par un autre processus depuis le chargement ; un
+        # store avec des écritures non sauvegardées est celui qui écrit
+        with self._lock:
+            return not self._dirty and self._disk_stamp() != self._stamp
+
+    def _load(self):
+        if os.path.exists(self._index_path()):
+            try:
+                with open(self._index_path(), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.index = data["ids"]
+                self.version = data["version"]
+                self.sizes = data["shards"]
+            except Exception as e:
+                print(f"[WARNING] Corrupted store index {self._index_path()}, rebuilding from shards: {e}")
+                self.index, self.version, self.sizes = {}, 0, {}
+        self._recover()
+
+    def _recover(self):
+        # enregistrements ajoutés après la dernière sauvegarde de l'index
+        for shard_path in sorted(glob(os.path.join(self.path, "*" + SHARD_SUFFIX))):
+            shard = os.path.basename(shard_path)
+            start = self.sizes.get(shard, 0)
+            size = os.path.getsize(shard_path)
+            if size <= start:
+                continue
+            with open(shard_path, "rb") as f:
+                f.seek(start)
+                data = f.read()
+            offset = 0
+            while offset < len(data):
+                d = zlib.decompressobj(31)
+                try:
+                    entry = json.loads(d.decompress(data[offset:]).decode("utf-8"))
+                except (zlib.error, ValueError):
+                    break  # dernier enregistrement tronqué : espace mort
+                if not d.eof:
+                    break
+                length = len(data) - offset - len(d.unused_data)
+                self._apply(entry, [shard, start + offset, length, entry["_v"]])
+                offset += length
+            # pas de _dirty : un simple lecteur ne réécrit pas l'index
+            self.sizes[shard] = size
+
+    def _apply(self, entry, location):
+        doc_id = entry["_id"]
+        current = self.index.get(doc_id)
+        self.version = max(self.version, entry["_v"])
+        if current is not None and current[3] > entry["_v"]:
+            return
+        if entry.get("_deleted"):
+            self.index.pop(doc_id, None)
+        else:
+            self.index[doc_id] = location
+
+    def flush(self):
+        with self._lock:
+            if self._writer:
+                self._writer.flush()
+            if not self._dirty:
+                return
+            tmp_path = self._index_path() + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "shards": self.sizes, "ids": self.index}, f)
+            os.replace(tmp_path, self._index_path())
+            self._dirty = False
+            self._stamp = self._disk_stamp()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            if self._writer:
+                self._writer.close()
+                self._writer = None
+            for f in self._readers.values():
+                f.close()
+            self._readers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- écriture ----------
+
+    def _current_shard(self, incoming):
+        shards = sorted(self.sizes)
+        if shards and self.sizes[shards[-1]] + incoming <= self.shard_max_bytes:
+            return shards[-1]
+        number = int(shards[-1].split(".")[0]) + 1 if shards else 0
+        return f"{number:05d}{SHARD_SUFFIX}"
+
+    def _append(self, entry):
+        blob = _compress(entry)
+        with self._lock:
+            shard = self._current_shard(len(blob))
+            if self._writer is None or self._writer.name != os.path.join(self.path, shard):
+                if self._writer:
+                    self._writer.close()
+                self._writer = open(os.path.join(self.path, shard), "ab")
+            # fin réelle du fichier (un enregistrement tronqué peut la décaler)
+            self._writer.seek(0, os.SEEK_END)
+            offset = self._writer.tell()
+            self._writer.write(blob)
+            self._writer.flush()
+            self.sizes[shard] = offset + len(blob)
+            self._dirty = True
+            return [shard, offset, len(blob), entry["_v"]]
+
+    def put(self, doc_id, record):
+        with self._lock:
+            self.version += 1
+            self.index[doc_id] = self._append({"_id": doc_id, "_v": self.version, "doc": record})
+
+    def delete(self, doc_id):
+        with self._lock:
+            if doc_id not in self.index:
+                return False
+            self.version += 1
+            self._append({"_id": doc_id, "_v": self.version, "_deleted": True})
+            del self.index[doc_id]
+            return True
+
+    # ---------- lecture ----------
+
+    def __contains__(self, doc_id):
+        return doc_id in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def ids(self):
+        return list(self.index)
+
+    def doc_version(self, doc_id):
+        # change à chaque réécriture de l'article (remplace le mtime d'un fichier)
+        loc = self.index.get(doc_id)
+        return loc[3] if loc else None
+
+    def _read(self, shard, offset, length):
+        with self._lock:
+            f = self._readers.get(shard)
+            if f is None:
+                f = self._readers[shard] = open(os.path.join(self.path, shard), "rb")
+            f.seek(offset)
+            return f.read(length)
+
+    def get(self, doc_id, default=None):
+        loc = self.index.get(doc_id)
+        if loc is None:
+            return default
+        return _decompress(self._read(*loc[:3]))["doc"]
+
+    def items(self):
+        # lecture séquentielle shard par shard (un seul read par shard), dans
+        # l'ordre d'écriture
+        by_shard = {}
+        for doc_id, loc in list(self.index.items()):
+            by_shard.setdefault(loc[0], []).append((loc[1], loc[2], doc_id))
+        for shard in sorted(by_shard):
+            with open(os.path.join(self.path, shard), "rb") as f:
+                data = f.read()
+            for offset, length, doc_id in sorted(by_shard[shard]):
+                yield doc_id, _decompress(data[offset:offset + length])["doc"]
+
+    # ---------- maintenance ----------
+
+    def dead_bytes(self):
+        return sum(self.sizes.values()) - sum(loc[2] for loc in self.index.values())
+
+    def compact(self):
+        # recopie les enregistrements vivants (sans les recompresser) dans de
+        # nouveaux shards, puis supprime les anciens
+        with self._lock:
+            self.flush()
+            old_shards = sorted(self.sizes)
+            live = sorted(self.index.items(), key=lambda kv: (kv[1][0], kv[1][1]))
+            if self._writer:
+                self._writer.close()
+                self._writer = None
+            new_index = {}
+            if old_shards:
+                # les copies vont dans des shards neufs, jamais dans un ancien
+                self.sizes[f"{int(old_shards[-1].split('.')[0]) + 1:05d}{SHARD_SUFFIX}"] = 0
+            for doc_id, (shard, offset, length, version) in live:
+                blob = self._read(shard, offset, length)
+                target = self._current_shard(len(blob))
+                with open(os.path.join(self.path, target), "ab") as f:
+                    f.write(blob)
+                new_index[doc_id] = [target, self.sizes.get(target, 0), length, version]
+                self.sizes[target] = self.sizes.get(target, 0) + length
+            for f in self._readers.values():
+                f.close()
+            self._readers.clear()
+            self.index = new_index
+            for shard in old_shards:
+                del self.sizes[shard]
+            self._dirty = True
+            self.flush()
+            for shard in old_shards:
+                os.remove(os.path.join(self.path, shard))
+            self._stamp = self._disk_stamp()
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_store(path):
+    # une instance par dossier et par processus (écritures séquencées),
+    # rechargée si un autre processus a modifié le store entre-temps
+    key = os.path.abspath(path)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None or store.is_stale():
+            # l'ancienne instance n'est pas fermée : un autre thread peut
+            # encore y lire
+            store = _STORES[key] = CorpusStore(path)
+        return store
+
+
+def flush_stores():
+    with _STORES_LOCK:
+        for store in _STORES.values():
+            store.flush()
+
+
+def has_store(path):
+    return os.path.exists(os.path.join(path, INDEX_NAME)) or bool(glob(os.path.join(path, "*" + SHARD_SUFFIX)))
+
+
+def read_texts(path, limit=None):
+    # (id, texte) triés par id, depuis un store de textes ({"id", "text"}) ou
+    # un dossier de .txt de l'ancien format. Un document illisible (membre
+    # gzip tronqué, JSON invalide) est signalé et sauté, pas le reste
+    if has_store(path):
+        store = open_store(path)
+        for doc_id in sorted(store.ids())[:limit or None]:
+            try:
+                text = store.get(doc_id)["text"]
+            except Exception as e:
+                print(f"[ERROR] Failed to read {path}/{doc_id}: {e}")
+                continue
+            yield doc_id, text
+        return
+    for fpath in sorted(glob(os.path.join(path, "*.txt")))[:limit or None]:
+        try:
+            with open(fpath, "r", encoding="utf-8") as f:
+                text = f.read()
+        except Exception as e:
+            print(f"[ERROR] Failed to read {fpath}: {e}")
+            continue
+        yield os.path.splitext(os.path.basename(fpath))[0], text
@@ -0,0 +1,173 @@
+# Accès centralisé aux ressources NLTK (tokeniseur, tagger, WordNet,
+# stopwords, lexique VADER). Rien n'est vérifié ni chargé à l'import : chaque
+# ressource est cherchée une fois, au premier usage, et téléchargée au plus
+# une fois par processus si elle manque, comme avant. allow_downloads(False)
+# ou NLTK_ALLOW_DOWNLOAD=0 coupent le réseau (machine hors ligne).
+#
+#   python src/common/nltk_resources.py --download     # installe tout
+#   python src/common/nltk_resources.py --status       # état + temps d'import
+import os
+import sys
+import time
+import threading
+import functools
+import subprocess
+from importlib.metadata import version
+
+# nltk lui-même n'est importé qu'au premier usage (son import charge scipy,
+# plusieurs secondes). À partir de NLTK 3.9 le tokeniseur et le tagger ont
+# changé de ressource
+_NEW_NLTK = tuple(int(p) for p in version("nltk").split(".")[:2]) >= (3, 9)
+
+PUNKT = "punkt_tab" if _NEW_NLTK else "punkt"
+TAGGER_MODEL = "averaged_perceptron_tagger_eng" if _NEW_NLTK else "averaged_perceptron_tagger"
+
+# nom de la ressource (nltk.download) -> chemin cherché par nltk.data.find
+RESOURCES = {
+    PUNKT: f"tokenizers/{PUNKT}",
+    TAGGER_MODEL: f"taggers/{TAGGER_MODEL}",
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+    "omw-1.4": "corpora/omw-1.4",
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+}
+
+# modules d'analyse dont --status mesure le temps d'import
+ANALYSIS_MODULES = [
+    ("preprocessing", "lemmatization"),
+    ("preprocessing", "clean_corpus"),
+    ("lexicale_analysis", "lexical_stats"),
+    ("sentiment_analysis", "actor_sentiment"),
+    ("sentiment_analysis", "victim_sentiment"),
+]
+
+_allow_download = os.environ.get("NLTK_ALLOW_DOWNLOAD", "1") != "0"
+_found = {}
+_tried = set()
+_lock = threading.Lock()
+
+
+def allow_downloads(allow=True):
+    global _allow_download
+    _allow_download = allow
+
+
+def find(name):
+    # résultat mémorisé : nltk.data.find parcourt tous les dossiers nltk_data
+    with _lock:
+        if name not in _found:
+            import nltk
+            try:
+                nltk.data.find(RESOURCES.get(name, name))
+                _found[name] = True
+            except LookupError:
+                _found[name] = False
+        return _found[name]
+
+
+def ensure(*names, download=None):
+    download = _allow_download if download is None else download
+    for name in names:
+        if find(name):
+            continue
+        if not download or name in _tried:
+            raise LookupError(
+                f"NLTK resource '{name}' is not installed. Run "
+                f"'python src/common/nltk_resources.py --download {name}'"
+            )
+        # une seule tentative par processus : sans réseau, on échoue vite
+        _tried.add(name)
+        print(f"[INFO] Downloading NLTK resource '{name}'...")
+        import nltk
+        if not nltk.download(name, quiet=True):
+            raise LookupError(f"Download of NLTK resource '{name}' failed")
+        with _lock:
+            _found.pop(name, None)
+        if not find(name):
+            raise LookupError(f"NLTK resource '{name}' still missing after download")
+
+
+def download(names=None):
+    names = names or list(RESOURCES)
+    ensure(*names, download=True)
+
+
+@functools.lru_cache(maxsize=None)
+def lemmatizer():
+    ensure("wordnet", "omw-1.4")
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
+
+@functools.lru_cache(maxsize=None)
+def wordnet_version():
+    ensure("wordnet")
+    from nltk.corpus import wordnet
+    return wordnet.get_version()
+
+
+@functools.lru_cache(maxsize=None)
+def perceptron_tagger():
+    ensure(TAGGER_MODEL)
+    from nltk.tag.perceptron import PerceptronTagger
+    return PerceptronTagger()
+
+
+@functools.lru_cache(maxsize=None)
+def sentiment_analyzer():
+    ensure("vader_lexicon")
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+@functools.lru_cache(maxsize=None)
+def stopword_set(language="english"):
+    ensure("stopwords")
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words(language))
+
+
+def _time_import(module, folder=None):
+    # temps d'import dans un interpréteur neuf (sans cache), None si échec
+    src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    paths = [os.path.join(src_dir, "common")] + ([os.path.join(src_dir, folder)] if folder else [])
+    code = (
+        f"import sys, time; sys.path[:0] = {paths!r}; "
+        f"t0 = time.perf_counter(); import {module}; "
+        "print(time.perf_counter() - t0)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    return float(result.stdout.strip().splitlines()[-1]) if result.returncode == 0 else None
+
+
+def import_times(modules=ANALYSIS_MODULES):
+    # temps d'import de chaque module, et celui de `nltk` seul : les anciennes
+    # versions l'importaient toutes au chargement (coût minimal d'avant)
+    times = {"nltk (baseline)": _time_import("nltk")}
+    for folder, module in modules:
+        times[module] = _time_import(module, folder)
+    return times
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Check, download and time NLTK resources")
+    parser.add_argument("--download", nargs="*", metavar="NAME",
+                        help="Download the given resources (all if no name is given)")
+    parser.add_argument("--status", action="store_true", help="Show installed resources and import times")
+    args = parser.parse_args()
+
+    if args.download is not None:
+        download(args.download)
+    if args.status or args.download is None:
+        for name in RESOURCES:
+            print(f"{name:<32} {'installed' if find(name) else 'MISSING'}")
+        t0 = time.perf_counter()
+        times = import_times()
+        print(f"\n========== IMPORT TIMES ({time.perf_counter() - t0:.1f}s) ==========")
+        baseline = times.pop("nltk (baseline)")
+        for module, seconds in times.items():
+            line = f"{module:<20} " + (f"{seconds * 1000:.0f} ms" if seconds is not None else "import failed")
+            if seconds is not None and baseline is not None:
+                line += f"  (eager nltk import: >= {baseline * 1000:.0f} ms, saved >= {(baseline - seconds) * 1000:.0f} ms)"
+            print(line)
@@ -0,0 +1,85 @@
+import numpy as np
+
+import nltk_resources
+
+
+class BatchTagger:
+    """Étiquetage POS par lots avec une seule instance du tagger perceptron.
+
+    nltk.pos_tag (3.8) recrée le tagger, donc recharge son modèle, à chaque
+    appel. Ici il est chargé une fois par processus, et les étiquettes sont
+    rendues en tableaux uint8 d'indices dans `tagset` (un octet par token au
+    lieu d'un tuple (mot, tag)). Les étiquettes sont exactement celles de
+    nltk.pos_tag.
+    """
+
+    def __init__(self, tagger=None):
+        self._tagger = None
+        self.tagset = []
+        self._ids = {}
+        if tagger is not None:
+            self._set_tagger(tagger)
+
+    def _set_tagger(self, tagger):
+        self._tagger = tagger
+        # indices stables pour un même modèle
+        for tag in sorted(tagger.classes):
+            self.tag_id(tag)
+
+    def load(self):
+        if self._tagger is None:
+            self._set_tagger(nltk_resources.perceptron_tagger())
+        return self._tagger
+
+    def tag_id(self, tag):
+        idx = self._ids.get(tag)
+        if idx is None:
+            idx = self._ids[tag] = len(self.tagset)
+            self.tagset.append(tag)
+        return idx
+
+    def tag_ids(self, tokens):
+        if not tokens:
+            return np.zeros(0, dtype=np.uint8)
+        tag_id = self.tag_id
+        tagged = self.load().tag(tokens)
+        return np.fromiter((tag_id(tag) for _, tag in tagged), dtype=np.uint8, count=len(tokens))
+
+    def iter_tag_ids(self, tokens):
+        # même calcul que PerceptronTagger.tag, mais au fil de l'eau :
+        # l'étiquette du token i ne dépend que des tokens i-2..i+2 et des deux
+        # étiquettes précédentes, on peut s'arrêter en route sans rien changer
+        tagger = self.load()
+        tagdict = tagger.tagdict
+        predict = tagger.model.predict
+        prev, prev2 = tagger.START
+        context = tagger.START + [tagger.normalize(w) for w in tokens] + tagger.END
+        for i, word in enumerate(tokens):
+            tag = tagdict.get(word)
+            if not tag:
+                features = tagger._get_features(i, word, context, prev, prev2)
+                tag, _ = predict(features)
+            yield self.tag_id(tag)
+            prev2 = prev
+            prev = tag
+
+    def tag_batch(self, token_lists):
+        # une liste de tokens par document, le tagger est chargé une fois
+        return [self.tag_ids(tokens) for tokens in token_lists]
+
+    def decode(self, tag_ids):
+        tagset = self.tagset
+        return [tagset[i] for i in tag_ids]
+
+    def pos_tag(self, tokens):
+        # remplaçant direct de nltk.pos_tag
+        return list(zip(tokens, self.decode(self.tag_ids(tokens))))
+
+    def prefix_ids(self, prefix):
+        # indices des étiquettes commençant par `prefix` ("JJ", "VB", "NN"...)
+        self.load()
+        return {i for i, tag in enumerate(self.tagset) if tag.startswith(prefix)}
+
+
+# une instance par processus, partagée par le prétraitement et l'analyse lexicale
+TAGGER = BatchTagger()
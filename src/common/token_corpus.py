@@ -0,0 +1,244 @@
+# Corpus compilé en entiers : un vocabulaire, un tableau plat int32 des ids
+# de tokens et un tableau d'offsets par document, relus en mmap. Construit
+# une fois après clean_corpus (data/token_corpus/<catégorie>) à partir du
+# store de textes prétraités ; les analyses le lisent sans redécouper les
+# textes et sans garder tout le corpus en chaînes Python.
+#
+#   python src/common/token_corpus.py            # (re)construit si besoin
+import os
+import json
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
+
+from corpus_store import open_store, has_store, read_texts
+
+TOKEN_CORPUS_DIR = "./data/token_corpus"
+FORMAT_VERSION = 1
+CATEGORIES = ("gaza", "ukraine")
+
+
+def _source_version(src_dir):
+    # change à chaque écriture dans le store source (None : ancien format .txt)
+    return open_store(src_dir).version if has_store(src_dir) else None
+
+
+def _write_atomic(path, write):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def build_token_corpus(src_dir, out_dir):
+    """Compile le store de textes `src_dir` dans `out_dir`.
+
+    Les tokens sont ceux de text.split() ; les documents sont rangés par id
+    (même ordre que read_texts). Le vocabulaire est trié par fréquence
+    décroissante (à égalité, par première apparition) : les mots fréquents
+    ont les petits ids.
+    """
+    vocab_index = {}
+    token_ids = array("i")
+    offsets = array("q", [0])
+    doc_ids = []
+    for doc_id, text in read_texts(src_dir):
+        token_ids.extend([vocab_index.setdefault(t, len(vocab_index)) for t in text.split()])
+        offsets.append(len(token_ids))
+        doc_ids.append(doc_id)
+
+    ids = np.frombuffer(token_ids, dtype=np.int32) if token_ids else np.zeros(0, dtype=np.int32)
+    counts = np.bincount(ids, minlength=len(vocab_index))
+    order = np.argsort(-counts, kind="stable")
+    remap = np.empty(len(order), dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    first_seen = list(vocab_index)
+    vocab = [first_seen[i] for i in order]
+
+    os.makedirs(out_dir, exist_ok=True)
+    _write_atomic(os.path.join(out_dir, "tokens.npy"), lambda f: np.save(f, remap[ids]))
+    _write_atomic(os.path.join(out_dir, "offsets.npy"), lambda f: np.save(f, np.frombuffer(offsets, dtype=np.int64)))
+    _write_atomic(os.path.join(out_dir, "counts.npy"), lambda f: np.save(f, counts[order].astype(np.int64)))
+    _write_atomic(os.path.join(out_dir, "vocab.txt"), lambda f: f.write("\n".join(vocab).encode("utf-8")))
+    _write_atomic(os.path.join(out_dir, "doc_ids.json"), lambda f: f.write(json.dumps(doc_ids).encode("utf-8")))
+    # écrit en dernier : un meta.json à jour signifie un corpus complet
+    meta = {
+        "format": FORMAT_VERSION,
+        "source": os.path.abspath(src_dir),
+        "source_version": _source_version(src_dir),
+        "n_docs": len(doc_ids),
+        "n_tokens": int(len(ids)),
+        "vocab_size": len(vocab),
+    }
+    _write_atomic(os.path.join(out_dir, "meta.json"), lambda f: f.write(json.dumps(meta).encode("utf-8")))
+    print(f"[INFO] Token corpus {out_dir}: {meta['n_docs']} docs, {meta['n_tokens']} tokens, "
+          f"{meta['vocab_size']} types")
+    return meta
+
+
+def is_fresh(src_dir, out_dir):
+    meta_path = os.path.join(out_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    version = _source_version(src_dir)
+    return (meta.get("format") == FORMAT_VERSION and version is not None
+            and meta.get("source") == os.path.abspath(src_dir) and meta.get("source_version") == version)
+
+
+def ensure_token_corpus(src_dir, out_dir):
+    if not is_fresh(src_dir, out_dir):
+        build_token_corpus(src_dir, out_dir)
+    return TokenCorpus(out_dir)
+
+
+class TokenCorpus(Mapping):
+    """Corpus compilé, en lecture seule et mappé en mémoire.
+
+    Se lit comme le dict {doc_id: texte} des analyses (le texte est recréé à
+    la demande), et donne un accès direct aux entiers : ids(doc_id) renvoie
+    une vue int32 sur le tableau plat, `vocab` la table id -> mot. select()
+    renvoie une vue sur une partie des documents, sans copie.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.token_ids = np.load(os.path.join(path, "tokens.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self.counts = np.load(os.path.join(path, "counts.npy"), mmap_mode="r")
+        with open(os.path.join(path, "doc_ids.json"), "r", encoding="utf-8") as f:
+            self.all_doc_ids = json.load(f)
+        self._vocab = None
+        self._word_ids = None
+        self._docs = np.arange(len(self.all_doc_ids))
+        self._position = None
+
+    # ---------- vocabulaire ----------
+
+    @property
+    def vocab(self):
+        if self._vocab is None:
+            with open(os.path.join(self.path, "vocab.txt"), "r", encoding="utf-8") as f:
+                self._vocab = f.read().split("\n")[:self.meta["vocab_size"]]
+        return self._vocab
+
+    def word_id(self, word, default=None):
+        if self._word_ids is None:
+            self._word_ids = {w: i for i, w in enumerate(self.vocab)}
+        return self._word_ids.get(word, default)
+
+    def decode(self, ids):
+        vocab = self.vocab
+        return [vocab[i] for i in ids.tolist()]
+
+    # ---------- documents ----------
+
+    def select(self, min_tokens=0, limit=None):
+        # mêmes règles que load_corpus_texts : les `limit` premiers documents,
+        # puis ceux d'au moins `min_tokens` tokens
+        view = object.__new__(TokenCorpus)
+        view.__dict__.update(self.__dict__)
+        docs = self._docs[:limit]
+        lengths = self.offsets[docs + 1] - self.offsets[docs]
+        view._docs = docs[lengths >= min_tokens]
+        view._position = None
+        return view
+
+    def _index(self, doc_id):
+        if self._position is None:
+            self._position = {self.all_doc_ids[i]: i for i in self._docs.tolist()}
+        return self._position[doc_id]
+
+    def _slice(self, i):
+        return self.token_ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def ids(self, doc_id):
+        return self._slice(self._index(doc_id))
+
+    def tokens(self, doc_id):
+        return self.decode(self.ids(doc_id))
+
+    def iter_ids(self):
+        for i in self._docs.tolist():
+            yield self.all_doc_ids[i], self._slice(i)
+
+    def iter_tokens(self):
+        for doc_id, ids in self.iter_ids():
+            yield doc_id, self.decode(ids)
+
+    def lengths(self):
+        return self.offsets[self._docs + 1] - self.offsets[self._docs]
+
+    def sentences(self, min_tokens=0):
+        # itérable relançable (Word2Vec le parcourt à chaque époque)
+        return _Sentences(self, min_tokens)
+
+    # ---------- interface dict {doc_id: texte} ----------
+
+    def __getitem__(self, doc_id):
+        return " ".join(self.tokens(doc_id))
+
+    def __iter__(self):
+        for i in self._docs.tolist():
+            yield self.all_doc_ids[i]
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, doc_id):
+        try:
+            self._index(doc_id)
+            return True
+        except KeyError:
+            return False
+
+
+class _Sentences:
+    def __init__(self, corpus, min_tokens):
+        self.corpus = corpus
+        self.min_tokens = min_tokens
+
+    def __iter__(self):
+        for _, ids in self.corpus.iter_ids():
+            if len(ids) >= self.min_tokens:
+                yield self.corpus.decode(ids)
+
+
+def load_token_corpora(base_dir, min_tokens=0, limit=None, token_dir=TOKEN_CORPUS_DIR, categories=CATEGORIES):
+    # corpus compilés à jour pour les catégories de `base_dir` ({} sinon)
+    corpora = {}
+    for cat in categories:
+        src_dir = os.path.join(base_dir, cat)
+        out_dir = os.path.join(token_dir, cat)
+        if os.path.isdir(src_dir) and is_fresh(src_dir, out_dir):
+            corpora[cat] = TokenCorpus(out_dir).select(min_tokens, limit)
+    return corpora
+
+
+def main(base_dir="data/processed_clean", token_dir=TOKEN_CORPUS_DIR, force=False):
+    for cat in CATEGORIES:
+        src_dir = os.path.join(base_dir, cat)
+        out_dir = os.path.join(token_dir, cat)
+        if not os.path.isdir(src_dir):
+            print(f"[WARNING] No processed corpus in {src_dir}")
+        elif force or not is_fresh(src_dir, out_dir):
+            build_token_corpus(src_dir, out_dir)
+        else:
+            print(f"[INFO] Token corpus {out_dir} is up to date")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compile data/processed_clean into memory-mapped token ids")
+    parser.add_argument("--data", default="data/processed_clean")
+    parser.add_argument("--out", default=TOKEN_CORPUS_DIR)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+    main(args.data, args.out, args.force)
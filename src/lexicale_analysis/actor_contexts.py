@@ -0,0 +1,97 @@
+# src/lexicale_analysis/actor_contexts.py
+# Contextes de tous les acteurs en un passage par corpus : une table
+# terme -> acteurs remplace les tests `t in actor_lemmas` (une liste par
+# acteur et par fonction), et chaque document est parcouru une fois pour
+# actor_term_contexts, actor_pos_contexts et build_actor_cooccurrence
+# réunis. Les comptes, et leur ordre, sont ceux de ces trois fonctions.
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from lexical_stats import USE_SPACY, TAGGER, tag_documents, actor_pos_contexts
+
+ACTORS = {
+    "palestin": ["palestin", "palestinian", "palestine", "hamas"],
+    "israel": ["israel", "israeli", "idf"],
+    "ukraine": ["ukraine", "ukrainian", "zelensky"],
+    "russia": ["russia", "russian", "putin"]
+}
+
+POS_GROUPS = (("ADJ", "JJ"), ("VERB", "VB"), ("NOUN", "NN"))
+
+
+def actor_index(actors: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    # terme -> acteurs qui le contiennent (un terme peut servir à plusieurs)
+    index = {}
+    for key, lemmas in actors.items():
+        for lemma in dict.fromkeys(lemmas):
+            index.setdefault(lemma, []).append(key)
+    return index
+
+
+def actor_contexts(docs: Dict[str, str], actors: Dict[str, List[str]] = ACTORS,
+                   term_window: int = 8, term_topk: int = 200,
+                   pos_window: int = 5, pos_topk: int = 100,
+                   cooc_window: int = 5, tagged=None, tagger=TAGGER) -> Dict[str, Dict]:
+    """Pour chaque acteur : {"terms", "pos", "cooccurrence"}.
+
+    "terms" = actor_term_contexts(docs, lemmas, term_window, term_topk),
+    "pos" = actor_pos_contexts(docs, lemmas, pos_window, pos_topk),
+    "cooccurrence" = build_actor_cooccurrence(docs, lemmas, cooc_window).
+    """
+    index = actor_index(actors)
+    terms = {key: Counter() for key in actors}
+    cooc = {key: defaultdict(int) for key in actors}
+    pos = {key: {name: Counter() for name, _ in POS_GROUPS} for key in actors}
+
+    groups = {}
+    if not USE_SPACY:
+        if tagged is None:
+            tagged = tag_documents(docs, tagger)
+        for name, prefix in POS_GROUPS:
+            for tag_id in tagger.prefix_ids(prefix):
+                groups[tag_id] = name
+
+    for doc_id, text in docs.items():
+        tokens = text.split()
+        L = len(tokens)
+        for i, t in enumerate(tokens):
+            keys = index.get(t)
+            if keys is None:
+                continue
+            context = tokens[max(0, i-term_window):i] + tokens[i+1:i+1+term_window]
+            pairs = [(t, tokens[j]) for j in range(max(0, i-cooc_window), min(L, i+cooc_window+1)) if j != i]
+            for key in keys:
+                terms[key].update(context)
+                co = cooc[key]
+                for pair in pairs:
+                    co[pair] += 1
+
+        if USE_SPACY:
+            continue
+        pos_tokens, tag_ids = tagged[doc_id]
+        lowered = [tok.lower() for tok in pos_tokens]
+        L = len(pos_tokens)
+        for i, tok in enumerate(lowered):
+            keys = index.get(tok)
+            if keys is None:
+                continue
+            window = [(groups[tag], lowered[j]) for j, tag in
+                      enumerate(tag_ids[max(0, i-pos_window):min(L, i+pos_window+1)].tolist(), max(0, i-pos_window))
+                      if tag in groups]
+            for key in keys:
+                counters = pos[key]
+                for name, word in window:
+                    counters[name][word] += 1
+
+    results = {}
+    for key, lemmas in actors.items():
+        if USE_SPACY:
+            pos_counts = actor_pos_contexts(docs, lemmas, window=pos_window, topk=pos_topk)
+        else:
+            pos_counts = {name: c.most_common(pos_topk) for name, c in pos[key].items()}
+        results[key] = {
+            "terms": terms[key].most_common(term_topk),
+            "pos": pos_counts,
+            "cooccurrence": dict(cooc[key])
+        }
+    return results
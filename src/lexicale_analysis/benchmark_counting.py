@@ -0,0 +1,76 @@
+# Benchmark des comptages de compare_corpora : get_word_counts,
+# get_ngrams_counts (n=2, n=3), article_stats et build_cooccurrence (cinq
+# passages sur le corpus) contre count_corpus (un seul passage sur des ids)
+# et cooccurrence_matrix, comme dans run_all.
+# Vérifie que les listes écrites dans les CSV sont identiques.
+#
+#   python src/lexicale_analysis/benchmark_counting.py --docs 5000
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+from corpus_store import read_texts
+from frequency import get_word_counts, get_ngrams_counts
+from lexical_stats import article_stats
+from similarity import build_cooccurrence
+from counting import count_corpus, KINDS
+from cooccurrence import cooccurrence_matrix
+
+
+def load_docs(n_docs, base="data/processed_clean"):
+    docs = {}
+    for cat in ("gaza", "ukraine"):
+        cat_dir = os.path.join(base, cat)
+        if os.path.isdir(cat_dir):
+            docs.update((f"{cat}_{doc_id}", text) for doc_id, text in read_texts(cat_dir, n_docs))
+    if not docs:
+        print(f"[INFO] No articles in {base}, using synthetic texts")
+        rng = random.Random(0)
+        # vocabulaire zipfien, proche d'un corpus lemmatisé
+        words = ["".join(rng.choice("abcdefghijklmnoprstu") for _ in range(rng.randint(3, 10))) for _ in range(20000)]
+        weights = [1.0 / (rank + 1) for rank in range(len(words))]
+        for i in range(n_docs):
+            docs[f"doc{i:06d}"] = " ".join(rng.choices(words, weights, k=rng.randint(100, 800)))
+    return dict(list(docs.items())[:n_docs])
+
+
+def run_benchmark(docs):
+    t0 = time.perf_counter()
+    words = get_word_counts(docs)
+    bigrams = get_ngrams_counts(docs, n=2)
+    trigrams = get_ngrams_counts(docs, n=3)
+    stats = article_stats(docs)
+    co, _ = build_cooccurrence(docs, vocab_set=None, window=5)
+    top_pairs = sorted(co.items(), key=lambda x: -x[1])[:500]
+    t_before = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cc = count_corpus(docs, window=5, kinds=KINDS)
+    after = (cc.most_common("unigram"), cc.most_common("bigram"), cc.most_common("trigram"),
+             cc.article_stats, cooccurrence_matrix(docs, window=5).most_common(500))
+    t_after = time.perf_counter() - t0
+
+    before = (words.most_common(), bigrams.most_common(), trigrams.most_common(), stats, top_pairs)
+    return {
+        "before_sec": t_before,
+        "after_sec": t_after,
+        "identical": before == after,
+        "tokens": sum(words.values()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark separate counting passes against count_corpus")
+    parser.add_argument("--docs", type=int, default=5000)
+    args = parser.parse_args()
+
+    docs = load_docs(args.docs)
+    r = run_benchmark(docs)
+    print(f"\n========== RESULTS ({len(docs)} docs, {r['tokens']} tokens) ==========")
+    print(f"separate passes : {r['before_sec']:.2f} s")
+    print(f"count_corpus    : {r['after_sec']:.2f} s  (x{r['before_sec'] / r['after_sec']:.1f})")
+    print(f"identical results: {r['identical']}")
@@ -4,10 +4,13 @@ from pathlib import Path
 import argparse
 
 from load_data import load_corpus_texts, save_json, save_csv_rows
-from frequency import compute_and_save_all, actor_term_contexts, get_word_counts
-from lexical_stats import article_stats, save_article_stats, actor_pos_contexts
+from frequency import compute_and_save_all
+from counting import count_corpus, KINDS, SKETCH_MB
+from cooccurrence import cooccurrence_matrix, pairs_table, WEIGHTINGS
+from actor_contexts import actor_contexts, ACTORS
+from lexical_stats import save_article_stats
 from tfidf import compute_tfidf_for_corpus, top_terms_per_corpus, save_tfidf_terms
-from similarity import compute_cosine_similarity, save_similarity_matrix, build_cooccurrence, build_actor_cooccurrence
+from similarity import compute_cosine_similarity, save_similarity_matrix
 import numpy as np
 import pandas as pd
 from collections import Counter
@@ -46,19 +49,26 @@ def compute_log_odds(counts_a:Counter, counts_b:Counter, prior:float=0.01):
     }).sort_values("z", ascending=False)
     return df
 
-def run_all(data_base: str = "data/processed_clean"):
+def run_all(data_base: str = "data/processed_clean", approx_top_n: int = None, sketch_mb: float = SKETCH_MB,
+            cooc_weighting: str = None):
     ensure_dirs()
     corpora = load_corpus_texts(data_base)
     # 1) Frequency + ngrams
     print("[1/9] Frequency & n-grams...")
-    counters = compute_and_save_all(corpora, STATS_DIR)
+    # un passage par corpus : n-grammes et stats par article (les
+    # cooccurrences sont comptées à l'étape 7, en matrice creuse)
+    if approx_top_n:
+        print("[INFO] --approx-ngrams bounds the bigram and trigram tables only; "
+              "unigrams and cooccurrences are counted exactly")
+    counts = {cat: count_corpus(docs, window=5, kinds=KINDS, approx_top_n=approx_top_n, sketch_mb=sketch_mb)
+              for cat, docs in corpora.items()}
+    counters = compute_and_save_all(corpora, STATS_DIR, counts=counts, approx_top_n=approx_top_n)
 
     # 2) Lexical stats per article
     print("[2/9] Lexical stats...")
     all_art_stats = {}
     for cat, docs in corpora.items():
-        art_stats = article_stats(docs)
-        all_art_stats[cat] = art_stats
+        all_art_stats[cat] = counts[cat].article_stats
     save_article_stats(all_art_stats, os.path.join(STATS_DIR, "article_stats.csv"))
 
     # 3) TF-IDF per corpus and top terms
@@ -80,17 +90,16 @@ def run_all(data_base: str = "data/processed_clean"):
 
     # 4) Actor-term contexts
     print("[5/9] Actor term contexts...")
-    actors = {
-        "palestin": ["palestin","palestinian","palestine","hamas"],
-        "israel": ["israel","israeli","idf"],
-        "ukraine": ["ukraine","ukrainian","zelensky"],
-        "russia": ["russia","russian","putin"]
-    }
+    actors = ACTORS
+    # un passage par corpus pour tous les acteurs : contextes, POS et cooccurrences
+    contexts = {cat: actor_contexts(docs, actors, term_window=8, term_topk=200, pos_window=5, pos_topk=100,
+                                    cooc_window=5)
+                for cat, docs in corpora.items() if docs}
     for actor_key, lemmas in actors.items():
         # combine both corpora to find actor contexts per-corpus
         for cat, docs in corpora.items():
             if not docs: continue
-            ctx = actor_term_contexts(docs, lemmas, window=8, topk=200)
+            ctx = contexts[cat][actor_key]["terms"]
             # write CSV
             rows = [{"term": t, "count": c} for t,c in ctx]
             save_csv_rows(os.path.join(STATS_DIR, f"{cat}_actor_{actor_key}_context.csv"), ["term","count"], rows)
@@ -100,7 +109,7 @@ def run_all(data_base: str = "data/processed_clean"):
     for actor_key, lemmas in actors.items():
         for cat, docs in corpora.items():
             if not docs: continue
-            pos_counts = actor_pos_contexts(docs, lemmas, window=5, topk=100)
+            pos_counts = contexts[cat][actor_key]["pos"]
             # save results for ADJ/VERB/NOUN
             for pos_tag, items in pos_counts.items():
                 rows = [{"token": t, "count": c} for t,c in items]
@@ -120,12 +129,16 @@ def run_all(data_base: str = "data/processed_clean"):
     print("[8/9] Cooccurrence...")
     for cat, docs in corpora.items():
         if not docs: continue
-        co, unig = build_cooccurrence(docs, vocab_set=None, window=5)
-        total_windows = sum(unig.values())
-
-        top_pairs = sorted(co.items(), key=lambda x: -x[1])[:500]
+        cooc = cooccurrence_matrix(docs, window=5)
+        top_pairs = cooc.most_common(500)
         rows2 = [{"w1": a, "w2": b, "count": c} for (a,b),c in top_pairs]
         save_csv_rows(os.path.join(STATS_DIR, f"{cat}_top_cooccurrence_pairs.csv"), ["w1","w2","count"], rows2)
+        # associations (PPMI) sur la matrice creuse, paires vues au moins 5 fois ;
+        # avec une pondération par distance, les comptes de ce tableau sont pondérés
+        if cooc_weighting is not None:
+            cooc = cooccurrence_matrix(docs, window=5, weighting=cooc_weighting)
+        rows3 = pairs_table(cooc, k=500, measure="ppmi", min_count=5)
+        save_csv_rows(os.path.join(STATS_DIR, f"{cat}_top_ppmi_pairs.csv"), ["w1","w2","count","pmi","npmi"], rows3)
 
     # 8) Combined TF-IDF and similarity matrix (cross-corpus)
     print("[9/9] Combined TF-IDF and similarity...")
@@ -158,7 +171,7 @@ def run_all(data_base: str = "data/processed_clean"):
     for actor_key, lemmas in actors.items():
         for cat, docs in corpora.items():
             if not docs: continue
-            co_actor = build_actor_cooccurrence(docs, lemmas, window=5)
+            co_actor = contexts[cat][actor_key]["cooccurrence"]
             # save results
             rows = [{"actor_lemma": a, "context_word": b, "count": c} for (a,b),c in co_actor.items()]
             save_csv_rows(os.path.join(STATS_DIR, f"{cat}_actor_{actor_key}_cooccurrence.csv"), ["actor_lemma","context_word","count"], rows)
@@ -166,5 +179,13 @@ def run_all(data_base: str = "data/processed_clean"):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run lexical analysis pipeline (integrated)")
     parser.add_argument("--data", default="data/processed_clean", help="Base folder for cleaned texts")
+    parser.add_argument("--approx-ngrams", type=int, default=None, metavar="N",
+                        help="Estimate bigrams/trigrams in fixed memory and keep the top N "
+                             "(unigrams and cooccurrences stay exact)")
+    parser.add_argument("--sketch-mb", type=float, default=SKETCH_MB,
+                        help="Memory per n-gram sketch in MB (with --approx-ngrams)")
+    parser.add_argument("--cooc-weighting", choices=[w for w in WEIGHTINGS if w], default=None,
+                        help="Weight cooccurrences by distance in the PPMI table (default: raw counts)")
     args = parser.parse_args()
-    run_all(data_base=args.data)
+    run_all(data_base=args.data, approx_top_n=args.approx_ngrams, sketch_mb=args.sketch_mb,
+            cooc_weighting=args.cooc_weighting)
@@ -0,0 +1,242 @@
+# src/lexicale_analysis/cooccurrence.py
+# Cooccurrences en matrice creuse vocab x vocab (scipy.sparse.csr_matrix),
+# construites sur les ids de tokens : pour chaque décalage d de la fenêtre,
+# toutes les paires (t_i, t_i+d) d'un paquet de documents sont ajoutées d'un
+# coup. La mémoire dépend du nombre de cases non nulles, pas d'un dict de
+# tuples. PMI, PPMI et NPMI sont calculés directement sur la matrice.
+from typing import Dict
+
+import numpy as np
+from scipy import sparse
+
+from counting import encode_docs, CHUNK_TOKENS
+from token_corpus import TokenCorpus
+
+WEIGHTINGS = (None, "harmonic", "linear")
+MEASURES = ("pmi", "ppmi", "npmi")
+
+
+def _distance_weight(d, window, weighting):
+    # poids d'une paire à distance d (1 <= d <= window)
+    if weighting is None:
+        return 1
+    if weighting == "harmonic":
+        return 1.0 / d
+    if weighting == "linear":
+        return (window - d + 1) / window
+    raise ValueError(f"Unknown weighting '{weighting}' (expected one of {WEIGHTINGS})")
+
+
+def _encode(docs):
+    # (source relisible des ids, vocabulaire)
+    if isinstance(docs, TokenCorpus):
+        return docs, docs.vocab
+    return encode_docs(docs)
+
+
+def _iter_ids(source):
+    return source.iter_ids() if isinstance(source, TokenCorpus) else iter(source)
+
+
+def _concat(arrays):
+    ids = np.concatenate(arrays).astype(np.int64)
+    lengths = np.array([len(a) for a in arrays], dtype=np.int64)
+    ends = np.cumsum(lengths)
+    return ids, np.repeat(ends - lengths, lengths), np.repeat(ends, lengths)
+
+
+def _chunks(source, chunk_tokens):
+    # paquets de documents non vides : (ids, début et fin du document de
+    # chaque token) ; les positions se suivent d'un paquet à l'autre
+    arrays, size = [], 0
+    for _, ids in _iter_ids(source):
+        if len(ids):
+            arrays.append(np.asarray(ids))
+            size += len(ids)
+        if size >= chunk_tokens:
+            yield _concat(arrays)
+            arrays, size = [], 0
+    if arrays:
+        yield _concat(arrays)
+
+
+class Cooccurrence:
+    """Matrice de cooccurrences et comptes des mots, indexés par `vocab`."""
+
+    def __init__(self, matrix, vocab, unigrams, window, weighting, source=None, chunk_tokens=CHUNK_TOKENS):
+        self.matrix = matrix
+        self.vocab = vocab
+        self.unigrams = unigrams
+        self.window = window
+        self.weighting = weighting
+        # ids des documents, relus seulement pour départager les égalités
+        self._source = source
+        self._chunk_tokens = chunk_tokens
+
+    @property
+    def nnz(self):
+        return self.matrix.nnz
+
+    def association(self, measure="ppmi", min_count=1, cds=1.0):
+        return association(self.matrix, measure, min_count, cds)
+
+    def most_common(self, k=500):
+        """[((w1, w2), compte)] dans l'ordre de
+        sorted(build_cooccurrence(...)[0].items(), key=lambda x: -x[1])[:k].
+
+        À égalité, la paire vue la première dans le corpus passe devant : les
+        candidats (au moins le k-ième compte) sont cherchés dans les ids,
+        paquet par paquet, jusqu'à ce que tous aient été vus.
+        """
+        coo = self.matrix.tocoo()
+        rows, cols, data = coo.row.astype(np.int64), coo.col.astype(np.int64), coo.data
+        if k is not None and k < len(data):
+            if k <= 0:
+                return []
+            candidates = np.flatnonzero(data >= np.partition(data, -k)[-k])
+            rows, cols, data = rows[candidates], cols[candidates], data[candidates]
+        order = np.lexsort((self._first_occurrence(rows, cols), -data))[:k]
+        vocab = self.vocab
+        return [((vocab[r], vocab[c]), v)
+                for r, c, v in zip(rows[order].tolist(), cols[order].tolist(), data[order].tolist())]
+
+    def _first_occurrence(self, rows, cols):
+        # rang d'insertion dans build_cooccurrence : i * 2*window + case,
+        # i position globale du mot central
+        n_vocab = len(self.vocab)
+        keys = rows * n_vocab + cols
+        by_key = np.argsort(keys)
+        sorted_keys = keys[by_key]
+        missing = np.iinfo(np.int64).max
+        first = np.full(len(keys), missing, dtype=np.int64)
+        if self._source is not None and len(keys):
+            offsets = [d for d in range(-self.window, self.window + 1) if d != 0]
+            base = 0
+            for ids, doc_start, doc_end in _chunks(self._source, self._chunk_tokens):
+                pos = np.arange(len(ids), dtype=np.int64)
+                for slot, d in enumerate(offsets):
+                    valid = pos[(pos + d >= doc_start) & (pos + d < doc_end)]
+                    key = ids[valid] * n_vocab + ids[valid + d]
+                    idx = np.minimum(np.searchsorted(sorted_keys, key), len(sorted_keys) - 1)
+                    hit = sorted_keys[idx] == key
+                    np.minimum.at(first, idx[hit], (base + valid[hit]) * len(offsets) + slot)
+                base += len(ids)
+                # les paquets suivants ne peuvent donner que des rangs plus grands
+                if (first < missing).all():
+                    break
+        result = np.empty_like(first)
+        result[by_key] = first
+        return result
+
+    def top_pairs(self, k=500, measure=None, min_count=1):
+        # [((w1, w2), valeur)] : comptes, ou mesure d'association si `measure`
+        matrix = self.matrix if measure is None else self.association(measure, min_count)
+        rows, cols, values = top_cells(matrix, k)
+        vocab = self.vocab
+        return [((vocab[r], vocab[c]), v) for r, c, v in zip(rows.tolist(), cols.tolist(), values.tolist())]
+
+
+def cooccurrence_matrix(docs: Dict[str, str], window: int = 5, vocab_set: set = None, weighting: str = None,
+                        chunk_tokens: int = CHUNK_TOKENS) -> Cooccurrence:
+    """Même fenêtre que similarity.build_cooccurrence (paires dans les deux sens).
+
+    `vocab_set` exclut les mots hors vocabulaire avant de former les paires
+    (les distances restent celles du texte). `weighting` : None (comptes),
+    "harmonic" (1/d) ou "linear" ((window - d + 1) / window).
+    """
+    source, vocab = _encode(docs)
+    n_vocab = len(vocab)
+    keep = None
+    if vocab_set is not None:
+        keep = np.fromiter((w in vocab_set for w in vocab), dtype=bool, count=n_vocab)
+    dtype = np.int64 if weighting is None else np.float64
+    weights = {d: _distance_weight(d, window, weighting) for d in range(1, window + 1)}
+
+    matrix = sparse.csr_matrix((n_vocab, n_vocab), dtype=dtype)
+    unigrams = np.zeros(n_vocab, dtype=np.int64)
+    for ids, _, doc_end in _chunks(source, chunk_tokens):
+        unigrams += np.bincount(ids, minlength=n_vocab)
+        usable = keep[ids] if keep is not None else np.ones(len(ids), dtype=bool)
+        pos = np.arange(len(ids), dtype=np.int64)
+        rows, cols, data = [], [], []
+        for d in range(1, window + 1):
+            # paires (i, i+d) dans un même document ; la matrice est symétrique,
+            # (i+d, i) est ajoutée par la transposée
+            left = pos[(pos + d < doc_end) & usable]
+            left = left[usable[left + d]]
+            rows.append(ids[left])
+            cols.append(ids[left + d])
+            data.append(np.full(len(left), weights[d], dtype=dtype))
+        rows, cols, data = np.concatenate(rows), np.concatenate(cols), np.concatenate(data)
+        half = sparse.coo_matrix((data, (rows, cols)), shape=(n_vocab, n_vocab)).tocsr()
+        matrix = matrix + half + half.T
+    matrix.sum_duplicates()
+    return Cooccurrence(matrix.tocsr(), vocab, unigrams, window, weighting, source, chunk_tokens)
+
+
+def association(matrix, measure="ppmi", min_count=1, cds=1.0):
+    """PMI, PPMI ou NPMI pour chaque case non nulle de `matrix`.
+
+    p(w, c) = M[w, c] / total, p(w) et p(c) tirés des sommes de lignes et
+    de colonnes. `cds` (< 1, 0.75 par exemple) lisse la distribution des
+    contextes comme dans Levy et al. (2015). Les cases sous `min_count` sont
+    ignorées. NPMI = PMI / -log p(w, c), dans [-1, 1].
+    """
+    if measure not in MEASURES:
+        raise ValueError(f"Unknown measure '{measure}' (expected one of {MEASURES})")
+    coo = matrix.tocoo()
+    mask = coo.data >= min_count
+    rows, cols, counts = coo.row[mask], coo.col[mask], coo.data[mask].astype(np.float64)
+    total = float(matrix.sum())
+    if total == 0:
+        return sparse.csr_matrix(matrix.shape, dtype=np.float64)
+    row_sums = np.asarray(matrix.sum(axis=1)).ravel().astype(np.float64)
+    col_sums = np.asarray(matrix.sum(axis=0)).ravel().astype(np.float64) ** cds
+    p_wc = counts / total
+    pmi = np.log(p_wc) - np.log(row_sums[rows] / total) - np.log(col_sums[cols] / col_sums.sum())
+    if measure == "ppmi":
+        pmi = np.maximum(pmi, 0.0)
+    elif measure == "npmi":
+        # p(w, c) = 1 : une seule paire possible, association maximale
+        denom = -np.log(p_wc)
+        pmi = np.divide(pmi, denom, out=np.ones_like(pmi), where=denom > 0)
+    result = sparse.csr_matrix((pmi, (rows, cols)), shape=matrix.shape)
+    result.eliminate_zeros()
+    return result
+
+
+def top_cells(matrix, k=500):
+    """Les k plus grandes cases (lignes, colonnes, valeurs), par valeur décroissante.
+
+    Sélection partielle (np.partition) puis tri des seuls candidats ; à
+    égalité, ordre (ligne, colonne).
+    """
+    coo = matrix.tocoo()
+    rows, cols, data = coo.row, coo.col, coo.data
+    if k is not None and k < len(data):
+        if k <= 0:
+            return rows[:0], cols[:0], data[:0]
+        candidates = np.flatnonzero(data >= np.partition(data, -k)[-k])
+        rows, cols, data = rows[candidates], cols[candidates], data[candidates]
+    order = np.lexsort((cols, rows, -data))[:k]
+    return rows[order], cols[order], data[order]
+
+
+def pairs_table(cooc: Cooccurrence, k=500, measure="ppmi", min_count=5):
+    # lignes w1, w2, count, pmi, npmi des k paires de plus forte `measure`
+    counts = cooc.matrix.tocsr()
+    pmi = cooc.association("pmi", min_count)
+    npmi = cooc.association("npmi", min_count)
+    ranked = cooc.association(measure, min_count) if measure != "pmi" else pmi
+    rows, cols, _ = top_cells(ranked, k)
+    vocab = cooc.vocab
+    table = []
+    for r, c in zip(rows.tolist(), cols.tolist()):
+        table.append({
+            "w1": vocab[r],
+            "w2": vocab[c],
+            "count": counts[r, c].item(),
+            "pmi": round(float(pmi[r, c]), 4),
+            "npmi": round(float(npmi[r, c]), 4),
+        })
+    return table
@@ -0,0 +1,260 @@
+# src/lexicale_analysis/counting.py
+# Comptages fusionnés : un seul passage sur les ids de tokens donne unigrammes,
+# bigrammes, trigrammes, statistiques par article et cooccurrences (fenêtre
+# glissante), au lieu de get_word_counts + 2 x get_ngrams_counts +
+# article_stats + build_cooccurrence qui redécoupent chacun tout le corpus.
+# Les n-grammes et les paires sont des entiers int64 (ids concaténés bit à
+# bit), comptés avec numpy par paquets de documents.
+#
+# L'ordre des résultats est celui des Counter d'origine : tri par nombre
+# décroissant puis, à égalité, par première apparition dans le corpus.
+#
+# Avec approx_top_n, bigrammes et trigrammes sont comptés de façon approchée
+# dans une mémoire fixe (sketch.py) au lieu de garder toutes les clés.
+import os
+import sys
+from collections import Counter
+from typing import Dict
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+from token_corpus import TokenCorpus
+from sketch import CountMinSketch, HeavyHitters, hash_columns, DEFAULT_DEPTH
+
+CHUNK_TOKENS = 1_000_000
+KINDS = ("unigram", "bigram", "trigram")
+ALL_KINDS = KINDS + ("cooccurrence",)
+SKETCH_MB = 64
+
+
+def encode_docs(docs: Dict[str, str]):
+    # (doc_id, ids) dans l'ordre des documents, et le vocabulaire (ordre de
+    # première apparition) : chaque texte n'est découpé qu'une fois
+    vocab_index = {}
+    encoded = []
+    for doc_id, text in docs.items():
+        ids = [vocab_index.setdefault(t, len(vocab_index)) for t in text.split() if t]
+        encoded.append((doc_id, np.array(ids, dtype=np.int32)))
+    return encoded, list(vocab_index)
+
+
+def _reduce(keys, counts, first):
+    # somme des nombres et première apparition (minimum) par clé ; le rang
+    # `first` rend inutile un tri stable
+    order = np.argsort(keys)
+    keys, first = keys[order], first[order]
+    if len(keys) == 0:
+        return keys, np.zeros(0, dtype=np.int64), first
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.add.reduceat(counts[order], starts) if counts is not None else np.diff(np.r_[starts, len(keys)])
+    return keys[starts], counts.astype(np.int64), np.minimum.reduceat(first, starts)
+
+
+def _count(keys, first):
+    return _reduce(keys, None, first)
+
+
+def _merge(acc, new):
+    if acc is None:
+        return new
+    return _reduce(*(np.concatenate([a, b]) for a, b in zip(acc, new)))
+
+
+class CorpusCounts:
+    """Résultats du passage fusionné (voir count_corpus)."""
+
+    def __init__(self, vocab, bits, window):
+        self.vocab = vocab
+        self.bits = bits
+        self.window = window
+        self.tables = {}
+        self.article_stats = {}
+        # trigrammes comptés en chaînes si 3 ids ne tiennent pas dans 63 bits
+        self.fallback = {}
+        # n-grammes comptés de façon approchée (HeavyHitters)
+        self.approx = {}
+
+    @staticmethod
+    def _size(kind):
+        return KINDS.index(kind) + 1 if kind in KINDS else 2
+
+    def _unpack(self, keys, n):
+        mask = (1 << self.bits) - 1
+        return [(keys >> (self.bits * (n - 1 - k))) & mask for k in range(n)]
+
+    def _terms(self, kind, columns):
+        words = self.vocab.__getitem__
+        n = len(columns)
+        cols = [map(words, c.tolist()) for c in columns]
+        if kind == "cooccurrence":
+            return list(zip(*cols))
+        return [" ".join(t) for t in zip(*cols)] if n > 1 else list(cols[0])
+
+    def most_common(self, kind="unigram", topk=None):
+        # équivalent de Counter.most_common sur les clés d'origine (n-grammes
+        # joints par un espace, paires (w1, w2) pour les cooccurrences)
+        if kind in self.fallback:
+            return self.fallback[kind].most_common(topk)
+        if kind in self.approx:
+            # (terme, estimation) ; voir error_bound()
+            ids, est = self.approx[kind].ranked(topk)
+            return list(zip(self._terms(kind, list(ids.T)), est.tolist()))
+        keys, counts, first = self.tables[kind]
+        if topk is not None and topk < len(counts):
+            # seules les clés au moins aussi fréquentes que la k-ième sont triées
+            if topk <= 0:
+                return []
+            keep = np.flatnonzero(counts >= np.partition(counts, -topk)[-topk])
+            keys, counts, first = keys[keep], counts[keep], first[keep]
+        order = np.lexsort((first, -counts))[:topk]
+        return list(zip(self._terms(kind, self._unpack(keys[order], self._size(kind))), counts[order].tolist()))
+
+    def counter(self, kind="unigram"):
+        # Counter avec le même ordre d'insertion que l'original
+        if kind in self.fallback:
+            return self.fallback[kind]
+        if kind in self.approx:
+            return Counter(dict(self.most_common(kind)))
+        keys, counts, first = self.tables[kind]
+        order = np.argsort(first, kind="stable")
+        return Counter(dict(zip(self._terms(kind, self._unpack(keys[order], self._size(kind))), counts[order].tolist())))
+
+    def error_bound(self, kind):
+        # surestimation maximale des comptes approchés (0 pour un compte exact)
+        # et probabilité que la borne tienne
+        if kind not in self.approx:
+            return 0.0, 1.0
+        sketch = self.approx[kind].sketch
+        return sketch.error_bound(), sketch.confidence
+
+
+def _article_stats(counts, doc_ids, ids, starts, lengths, word_len, n_vocab):
+    # mêmes valeurs que lexical_stats.article_stats, pour tout un paquet
+    n_docs = len(doc_ids)
+    doc_of = np.repeat(np.arange(n_docs), lengths)
+    uniq_pairs = np.unique(doc_of.astype(np.int64) * n_vocab + ids)
+    vocab_sizes = np.bincount(uniq_pairs // n_vocab, minlength=n_docs)
+    lens = word_len[ids]
+    nonempty = lengths > 0
+    len_sums = np.zeros(n_docs, dtype=np.int64)
+    max_lens = np.zeros(n_docs, dtype=np.int64)
+    if nonempty.any():
+        len_sums[nonempty] = np.add.reduceat(lens, starts[nonempty])
+        max_lens[nonempty] = np.maximum.reduceat(lens, starts[nonempty])
+    # premier token de longueur maximale dans chaque document
+    at_max = np.flatnonzero(lens == max_lens[doc_of])
+    _, first_at_max = np.unique(doc_of[at_max], return_index=True)
+    longest_pos = np.zeros(n_docs, dtype=np.int64)
+    longest_pos[nonempty] = at_max[first_at_max]
+    vocab = counts.vocab
+    for k, doc_id in enumerate(doc_ids):
+        n = int(lengths[k])
+        v = int(vocab_sizes[k])
+        counts.article_stats[doc_id] = {
+            "tokens": n,
+            "vocab": v,
+            "diversity": float(v / n) if n > 0 else 0.0,
+            "avg_word_len": float(int(len_sums[k]) / n) if n > 0 else 0.0,
+            "longest_word": vocab[ids[longest_pos[k]]] if n > 0 else ""
+        }
+
+
+def _pack(columns, bits):
+    key = columns[0]
+    for col in columns[1:]:
+        key = (key << bits) | col
+    return key
+
+
+def _count_chunk(counts, acc, doc_ids, arrays, base, window, word_len):
+    ids = np.concatenate(arrays).astype(np.int64) if arrays else np.zeros(0, dtype=np.int64)
+    lengths = np.array([len(a) for a in arrays], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    ends = starts + lengths
+    n = len(ids)
+    pos = np.arange(n, dtype=np.int64)
+    doc_start = np.repeat(starts, lengths)
+    doc_end = np.repeat(ends, lengths)
+    bits = counts.bits
+
+    _article_stats(counts, doc_ids, ids, starts, lengths, word_len, len(counts.vocab))
+    if "unigram" in acc:
+        acc["unigram"] = _merge(acc["unigram"], _count(ids, base + pos))
+
+    for size, kind in ((2, "bigram"), (3, "trigram")):
+        if kind in counts.fallback or (kind not in acc and kind not in counts.approx):
+            continue
+        valid = np.flatnonzero(pos + size <= doc_end)
+        if kind in counts.approx:
+            columns = [ids[valid + k] for k in range(size)]
+            key = _pack(columns, bits) if size * bits <= 63 else hash_columns(columns)
+            keys, n, first = _count(key, base + valid)
+            start = first - base
+            rows = np.stack([ids[start + k] for k in range(size)], axis=1)
+            counts.approx[kind].update(keys, n, first, rows)
+            continue
+        acc[kind] = _merge(acc[kind], _count(_pack([ids[valid + k] for k in range(size)], bits), base + valid))
+
+    if "cooccurrence" not in acc:
+        return
+
+    # paires (t_i, t_j) pour j de i-window à i+window, dans l'ordre des boucles
+    # de build_cooccurrence : rang d'insertion = i * 2*window + case
+    offsets = [d for d in range(-window, window + 1) if d != 0]
+    partner = pos[:, None] + np.array(offsets, dtype=np.int64)[None, :]
+    valid = (partner >= doc_start[:, None]) & (partner < doc_end[:, None])
+    rows, slots = np.nonzero(valid)
+    key = (ids[rows] << bits) | ids[partner[rows, slots]]
+    first = (base + rows) * len(offsets) + slots
+    acc["cooccurrence"] = _merge(acc["cooccurrence"], _count(key, first))
+
+
+def count_corpus(docs, window: int = 5, chunk_tokens: int = CHUNK_TOKENS, kinds=ALL_KINDS,
+                 approx_top_n: int = None, sketch_mb: float = SKETCH_MB, depth: int = DEFAULT_DEPTH) -> CorpusCounts:
+    """Un passage sur le corpus (dict {doc_id: texte} ou TokenCorpus).
+
+    `kinds` limite les comptages faits (les stats par article le sont
+    toujours). Avec `approx_top_n`, bigrammes et trigrammes sont estimés avec
+    un Count-Min Sketch de `sketch_mb` Mo chacun, et seuls les
+    4 * approx_top_n candidats les plus fréquents sont gardés ; most_common
+    rend alors des comptes estimés, jamais inférieurs aux vrais, et
+    error_bound(kind) la surestimation maximale. Seules ces deux tables sont
+    bornées : unigrammes et cooccurrences restent exacts.
+    """
+    if isinstance(docs, TokenCorpus):
+        vocab = docs.vocab
+        encoded = docs.iter_ids()
+    else:
+        encoded, vocab = encode_docs(docs)
+    bits = max(1, (len(vocab) - 1).bit_length())
+    counts = CorpusCounts(vocab, bits, window)
+    if approx_top_n:
+        for size, kind in ((2, "bigram"), (3, "trigram")):
+            if kind in kinds:
+                sketch = CountMinSketch.from_memory(sketch_mb, depth)
+                counts.approx[kind] = HeavyHitters(sketch, 4 * approx_top_n, size)
+    if 3 * bits > 63 and "trigram" in kinds and "trigram" not in counts.approx:
+        print(f"[WARNING] Vocabulary too large to pack trigrams ({len(vocab)} types), counting them as strings")
+        counts.fallback["trigram"] = Counter()
+    word_len = np.fromiter(map(len, vocab), dtype=np.int64, count=len(vocab))
+
+    acc = {kind: None for kind in kinds if kind not in counts.approx}
+    doc_ids, arrays, size, base = [], [], 0, 0
+    for doc_id, ids in encoded:
+        doc_ids.append(doc_id)
+        arrays.append(np.asarray(ids))
+        size += len(ids)
+        if "trigram" in counts.fallback:
+            tokens = [vocab[i] for i in np.asarray(ids).tolist()]
+            counts.fallback["trigram"].update(" ".join(tokens[i:i+3]) for i in range(len(tokens) - 2))
+        if size >= chunk_tokens:
+            _count_chunk(counts, acc, doc_ids, arrays, base, window, word_len)
+            doc_ids, arrays, base, size = [], [], base + size, 0
+    if doc_ids:
+        _count_chunk(counts, acc, doc_ids, arrays, base, window, word_len)
+
+    empty = (np.zeros(0, dtype=np.int64),) * 3
+    counts.tables = {kind: table if table is not None else empty for kind, table in acc.items()}
+    return counts
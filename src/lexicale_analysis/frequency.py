@@ -5,6 +5,8 @@ from pathlib import Path
 import csv, os
 import math
 
+from counting import count_corpus, CorpusCounts, KINDS, SKETCH_MB
+
 def get_word_counts(docs: Dict[str, str]) -> Counter:
     c = Counter()
     for text in docs.values():
@@ -26,14 +28,17 @@ def get_ngrams_counts(docs: Dict[str, str], n:int=2, min_count:int=1) -> Counter
                 del c[k]
     return c
 
-def save_wordfreq(counter, out_csv: str, top_n: int = None):
+def save_ranked(items, out_csv: str):
+    # liste (term, count) déjà triée
     Path(out_csv).parent.mkdir(parents=True, exist_ok=True)
-    items = counter.most_common(top_n)
     with open(out_csv, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(["term", "count"])
         writer.writerows(items)
 
+def save_wordfreq(counter, out_csv: str, top_n: int = None):
+    save_ranked(counter.most_common(top_n), out_csv)
+
 def actor_term_contexts(docs: Dict[str, str], actor_lemmas:List[str], window:int=10, topk:int=100):
     c = Counter()
     for text in docs.values():
@@ -47,17 +52,27 @@ def actor_term_contexts(docs: Dict[str, str], actor_lemmas:List[str], window:int
                 c.update(context)
     return c.most_common(topk)
 
-def compute_and_save_all(corpora: Dict[str, Dict[str, str]], out_dir: str):
-
+def compute_and_save_all(corpora: Dict[str, Dict[str, str]], out_dir: str, counts: Dict[str, CorpusCounts] = None,
+                         approx_top_n: int = None, sketch_mb: float = SKETCH_MB):
+    # un seul passage par corpus (count_corpus) ; `counts` permet de réutiliser
+    # des comptages déjà faits. Avec approx_top_n, bigrammes et trigrammes
+    # sont estimés en mémoire fixe et seuls les approx_top_n premiers sont
+    # écrits (comptes surestimés d'au plus la borne affichée)
     Path(out_dir).mkdir(parents=True, exist_ok=True)
     counters = {}
     for cat, docs in corpora.items():
-        cnt = get_word_counts(docs)
-        counters[cat] = cnt
-        save_wordfreq(cnt, os.path.join(out_dir, f"{cat}_wordfreq.csv"))
+        if counts and cat in counts:
+            cc = counts[cat]
+        else:
+            cc = count_corpus(docs, kinds=KINDS, approx_top_n=approx_top_n, sketch_mb=sketch_mb)
+        counters[cat] = cc.counter("unigram")
+        save_ranked(cc.most_common("unigram"), os.path.join(out_dir, f"{cat}_wordfreq.csv"))
         # ngrams
-        bi = get_ngrams_counts(docs, n=2, min_count=1)
-        tri = get_ngrams_counts(docs, n=3, min_count=1)
-        save_wordfreq(bi, os.path.join(out_dir, f"{cat}_bigrams.csv"))
-        save_wordfreq(tri, os.path.join(out_dir, f"{cat}_trigrams.csv"))
+        for kind, name in (("bigram", "bigrams"), ("trigram", "trigrams")):
+            top_n = approx_top_n if kind in cc.approx else None
+            save_ranked(cc.most_common(kind, top_n), os.path.join(out_dir, f"{cat}_{name}.csv"))
+            if kind in cc.approx:
+                bound, confidence = cc.error_bound(kind)
+                print(f"[INFO] {cat} {name}: top {top_n} approximate counts, overestimated by at most "
+                      f"{bound:.1f} (probability {confidence:.3f})")
     return counters
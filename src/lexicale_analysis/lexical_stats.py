@@ -5,8 +5,15 @@ from collections import Counter
 from pathlib import Path
 import csv
 import os
+import sys
 import numpy as np
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+import nltk_resources
+from pos_tagging import TAGGER
+from token_corpus import TokenCorpus
+
 USE_SPACY = False
 try:
     import spacy
@@ -14,18 +21,32 @@ try:
     doc = nlp(text)
 except Exception:
     USE_SPACY = False
-    import nltk
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except Exception:
-        nltk.download('punkt')
-    try:
-        nltk.data.find('taggers/averaged_perceptron_tagger')
-    except Exception:
-        nltk.download('averaged_perceptron_tagger')
-    from nltk import word_tokenize, pos_tag
+    # nltk, punkt et le tagger sont chargés au premier usage (nltk_resources)
+
+def _article_stats_ids(corpus: TokenCorpus) -> Dict[str, Dict]:
+    # mêmes valeurs que article_stats, calculées sur les ids de tokens
+    vocab = corpus.vocab
+    word_len = np.fromiter(map(len, vocab), dtype=np.int64, count=len(vocab))
+    stats = {}
+    for doc_id, ids in corpus.iter_ids():
+        tokens_count = len(ids)
+        vocab_size = len(np.unique(ids))
+        lengths = word_len[ids]
+        diversity = (vocab_size / tokens_count) if tokens_count > 0 else 0.0
+        avg_len = float(np.mean(lengths)) if tokens_count > 0 else 0.0
+        longest = vocab[ids[int(np.argmax(lengths))]] if tokens_count > 0 else ""
+        stats[doc_id] = {
+            "tokens": tokens_count,
+            "vocab": vocab_size,
+            "diversity": float(diversity),
+            "avg_word_len": float(avg_len),
+            "longest_word": longest
+        }
+    return stats
 
 def article_stats(docs: Dict[str, str]) -> Dict[str, Dict]:
+    if isinstance(docs, TokenCorpus):
+        return _article_stats_ids(docs)
     stats = {}
     for doc_id, text in docs.items():
         tokens = [t for t in text.split() if t]
@@ -68,7 +89,16 @@ def save_article_stats(all_stats: Dict[str, Dict[str, Dict]], out_csv: str):
 # POS-based context analysis
 # -----------------------
 from collections import Counter
-def actor_pos_contexts(docs: Dict[str, str], actor_lemmas:List[str], window:int=5, topk:int=50):
+def tag_documents(docs: Dict[str, str], tagger=TAGGER) -> Dict[str, Tuple[List[str], np.ndarray]]:
+    # un seul étiquetage par corpus, réutilisé pour tous les acteurs
+    from nltk import word_tokenize
+    nltk_resources.ensure(nltk_resources.PUNKT)
+    doc_ids = list(docs)
+    tokens = [word_tokenize(docs[doc_id]) for doc_id in doc_ids]
+    return dict(zip(doc_ids, zip(tokens, tagger.tag_batch(tokens))))
+
+def actor_pos_contexts(docs: Dict[str, str], actor_lemmas:List[str], window:int=5, topk:int=50,
+                       tagged=None, tagger=TAGGER):
 
     results = {"ADJ": Counter(), "VERB": Counter(), "NOUN": Counter()}
     if USE_SPACY:
@@ -87,18 +117,20 @@ def actor_pos_contexts(docs: Dict[str, str], actor_lemmas:List[str], window:int=
                         elif t.pos_ == "NOUN":
                             results["NOUN"][t.lemma_.lower()] += 1
     else:
-        from nltk import word_tokenize, pos_tag
-        for text in docs.values():
-            tokens = word_tokenize(text)
-            tags = pos_tag(tokens)
-            for i,(tok,tag) in enumerate(tags):
+        if tagged is None:
+            tagged = tag_documents(docs, tagger)
+        # étiquette -> groupe, par indice (même test startswith que sur les chaînes)
+        groups = {}
+        for name, prefix in (("ADJ", "JJ"), ("VERB", "VB"), ("NOUN", "NN")):
+            for tag_id in tagger.prefix_ids(prefix):
+                groups[tag_id] = results[name]
+        for doc_id in docs:
+            tokens, tag_ids = tagged[doc_id]
+            for i, tok in enumerate(tokens):
                 if tok.lower() in actor_lemmas:
-                    start = max(0, i-window); end = min(len(tags), i+window+1)
+                    start = max(0, i-window); end = min(len(tokens), i+window+1)
                     for j in range(start, end):
-                        w, t = tags[j]
-                        if t.startswith("JJ"): results["ADJ"][w.lower()] += 1
-                        elif t.startswith("VB"): results["VERB"][w.lower()] += 1
-                        elif t.startswith("NN"): results["NOUN"][w.lower()] += 1
+                        counter = groups.get(int(tag_ids[j]))
+                        if counter is not None:
+                            counter[tokens[j].lower()] += 1
     return {k: v.most_common(topk) for k,v in results.items()}
-
-
@@ -32,12 +32,13 @@ def build_cooccurrence(docs: Dict[str, str], vocab_set:set=None, window:int=5):
         for i,t in enumerate(tokens):
             unigram[t] += 1
             start = max(0, i-window); end = min(L, i+window+1)
+            if vocab_set and t not in vocab_set:
+                continue
             for j in range(start, end):
                 if i == j: continue
-                pair = (t, tokens[j])
-                if vocab_set and (t not in vocab_set or tokens[j] not in vocab_set):
+                if vocab_set and tokens[j] not in vocab_set:
                     continue
-                co[pair] += 1
+                co[(t, tokens[j])] += 1
     return co, unigram
 
 #Réseau de cooccurrences pour acteurs clés
@@ -0,0 +1,142 @@
+# src/lexicale_analysis/sketch.py
+# Comptage approché à mémoire bornée : Count-Min Sketch (Cormode &
+# Muthukrishnan, 2005) et table des `capacity` clés de plus forte estimation
+# (heavy hitters). Utilisé par count_corpus(approx_top_n=...) pour les
+# bigrammes et trigrammes, dont le nombre de clés distinctes croît avec le
+# corpus alors que la mémoire ici est fixée à l'avance.
+#
+# Bornes, pour N occurrences comptées, une table de largeur w et de
+# profondeur d :
+#   - une estimation ne sous-estime jamais : est(x) >= vrai(x) ;
+#   - est(x) <= vrai(x) + (e / w) * N avec une probabilité >= 1 - exp(-d).
+# Toute clé dont le vrai compte dépasse celui de la `capacity`-ième plus
+# forte estimation, plus cette marge, figure parmi les candidats.
+import math
+
+import numpy as np
+
+DEFAULT_DEPTH = 4
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix64(x):
+    # finaliseur de splitmix64 (arithmétique modulo 2**64)
+    x = x.astype(np.uint64, copy=True)
+    x ^= x >> np.uint64(30)
+    x *= _MIX1
+    x ^= x >> np.uint64(27)
+    x *= _MIX2
+    x ^= x >> np.uint64(31)
+    return x
+
+
+def hash_columns(columns):
+    # une clé 64 bits par ligne d'ids (n-gramme), quand les ids concaténés
+    # ne tiennent pas dans un int64 ; collisions de l'ordre de 2**-64
+    h = np.zeros(len(columns[0]), dtype=np.uint64)
+    for col in columns:
+        h = _mix64(h + _GOLDEN) ^ col.astype(np.uint64)
+    return _mix64(h).view(np.int64)
+
+
+class CountMinSketch:
+    """Table d x w de compteurs ; une fonction de hachage par ligne.
+
+    La largeur est arrondie à une puissance de deux (hachage
+    multiplication-décalage).
+    """
+
+    def __init__(self, width, depth=DEFAULT_DEPTH, seed=0):
+        self.bits = max(1, int(width - 1).bit_length())
+        self.width = 1 << self.bits
+        self.depth = depth
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2 ** 63, size=depth, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=depth, dtype=np.uint64)
+        self.table = np.zeros((depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    @classmethod
+    def from_memory(cls, memory_mb, depth=DEFAULT_DEPTH, seed=0):
+        # plus grande largeur (puissance de deux) tenant dans memory_mb
+        width = max(2, int(memory_mb * 2 ** 20) // (8 * depth))
+        return cls(1 << (width.bit_length() - 1), depth, seed)
+
+    def _columns(self, keys):
+        x = _mix64(np.asarray(keys).view(np.uint64))
+        shift = np.uint64(64 - self.bits)
+        return ((self.a[:, None] * x[None, :] + self.b[:, None]) >> shift).astype(np.intp)
+
+    def update(self, keys, counts):
+        cols = self._columns(keys)
+        for row in range(self.depth):
+            np.add.at(self.table[row], cols[row], counts)
+        self.total += int(counts.sum())
+
+    def estimate(self, keys):
+        if len(keys) == 0:
+            return np.zeros(0, dtype=np.int64)
+        cols = self._columns(keys)
+        return self.table[np.arange(self.depth)[:, None], cols].min(axis=0)
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def confidence(self):
+        return 1.0 - math.exp(-self.depth)
+
+    def error_bound(self):
+        # surestimation maximale (avec probabilité `confidence`) pour ce qui a
+        # été compté jusqu'ici
+        return self.epsilon * self.total
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+
+class HeavyHitters:
+    """Les `capacity` clés de plus forte estimation dans un CountMinSketch.
+
+    Chaque clé garde ses ids (pour la décoder) et son rang de première
+    apparition, qui départage les égalités comme dans count_corpus.
+    """
+
+    def __init__(self, sketch, capacity, n):
+        self.sketch = sketch
+        self.capacity = capacity
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.first = np.zeros(0, dtype=np.int64)
+        self.ids = np.zeros((0, n), dtype=np.int64)
+
+    def update(self, keys, counts, first, ids):
+        # keys uniques d'un paquet, avec leur nombre, leur première apparition
+        # et leurs ids (une ligne par clé)
+        self.sketch.update(keys, counts)
+        keys = np.concatenate([self.keys, keys])
+        first = np.concatenate([self.first, first])
+        ids = np.concatenate([self.ids, ids])
+        order = np.argsort(keys)
+        keys, first, ids = keys[order], first[order], ids[order]
+        if len(keys):
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            keys, first, ids = keys[starts], np.minimum.reduceat(first, starts), ids[starts]
+        if len(keys) > self.capacity:
+            keep = np.argpartition(-self.sketch.estimate(keys), self.capacity - 1)[:self.capacity]
+            keys, first, ids = keys[keep], first[keep], ids[keep]
+        self.keys, self.first, self.ids = keys, first, ids
+
+    def ranked(self, topk=None):
+        # (ids, estimation) par estimation décroissante puis première apparition
+        est = self.sketch.estimate(self.keys)
+        order = np.lexsort((self.first, -est))[:topk]
+        return self.ids[order], est[order]
+
+    @property
+    def nbytes(self):
+        return self.sketch.nbytes + self.keys.nbytes + self.first.nbytes + self.ids.nbytes
@@ -0,0 +1,70 @@
+# Benchmark du nettoyage du corpus (preprocess_to_string) selon le nombre de
+# processus, sur les articles de data/raw_text (ou des textes synthétiques si
+# le corpus n'a pas encore été construit). Vérifie aussi que la sortie est
+# identique à celle de l'exécution séquentielle.
+#
+#   python src/preprocessing/benchmark_clean.py --docs 400 --workers 1 2 4 8
+import argparse
+import os
+import random
+import time
+
+from clean_corpus import preprocess_records, CHUNK_SIZE
+from corpus_store import read_texts
+
+WORDS = (
+    "the army said civilians were killed when strikes hit buildings near the border while "
+    "officials reported that aid convoys remained blocked and families fled towards shelters "
+    "as talks between leaders continued in the capital despite growing international pressure"
+).split()
+
+
+def load_jobs(n_docs, raw_base="data/raw_text"):
+    jobs = []
+    for cat in ("gaza", "ukraine"):
+        cat_dir = os.path.join(raw_base, cat)
+        if os.path.isdir(cat_dir):
+            jobs.extend(read_texts(cat_dir, n_docs))
+    if not jobs:
+        print(f"[INFO] No articles in {raw_base}, using synthetic texts")
+        rng = random.Random(0)
+        jobs = [(f"doc{i}", " ".join(rng.choice(WORDS) for _ in range(700)) + ".") for i in range(n_docs)]
+    return jobs[:n_docs]
+
+
+def run_benchmark(jobs, worker_counts=(1, 2, 4, 8), chunksize=CHUNK_SIZE, ordered=True):
+    results = {}
+    reference = None
+    for workers in worker_counts:
+        t0 = time.perf_counter()
+        outputs, failed = {}, 0
+        for doc_id, text, error in preprocess_records(iter(jobs), workers, chunksize, ordered):
+            outputs[doc_id] = text
+            failed += error is not None
+        elapsed = time.perf_counter() - t0
+        if reference is None:
+            reference = outputs
+        results[workers] = {
+            "seconds": elapsed,
+            "docs_per_sec": len(jobs) / elapsed if elapsed else 0.0,
+            "identical": outputs == reference,
+            "failed": failed,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark multiprocess corpus cleaning")
+    parser.add_argument("--docs", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--unordered", action="store_true")
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.docs)
+    res = run_benchmark(jobs, args.workers, args.chunksize, not args.unordered)
+    base = res[args.workers[0]]["seconds"]
+    print(f"\n========== RESULTS ({len(jobs)} docs, {os.cpu_count()} cores) ==========")
+    for workers, r in res.items():
+        print(f"{workers:>3} worker(s): {r['seconds']:.2f}s  {r['docs_per_sec']:.1f} docs/s  "
+              f"speedup x{base / r['seconds']:.1f}  identical: {r['identical']}  failed: {r['failed']}")
@@ -0,0 +1,117 @@
+# Micro-benchmark de clean_text : TextCleaner (compilé) contre
+# l'implémentation d'origine (clean_text_reference). Vérifie d'abord que les
+# deux donnent exactement la même sortie sur un jeu de cas limites et sur les
+# articles de data/raw_text (ou des textes synthétiques), puis mesure la
+# latence par document.
+#
+#   python src/preprocessing/benchmark_clean_text.py --docs 500 --repeat 5
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+from clean_text import clean_text, clean_text_reference
+from corpus_store import read_texts
+
+GOLDEN_CASES = [
+    "",
+    "   ",
+    "Plain sentence with nothing to remove.",
+    "Read more at https://example.com/a_b-c.html and www.site.org/x, then stop.",
+    "Tom &amp; Jerry &lt;b&gt;bold&lt;/b&gt; &nbsp;spaced&#8212;dash",
+    "<p>Paragraph</p><a href=\"http://x.com/y\">link</a> tail",
+    "<a href=http://x.com>text</a> after > more",
+    "x.<b>.y and <x..> and <.> done",
+    "snake_case kebab-case dotted.name ..._-- runs",
+    "A subscribe B click here C\nsecond line kept\nPrivacy Policy at end",
+    "[subscribe] to our list\nthen text ] closing",
+    "x [a click here b\nc] d",
+    "NEWSLETTER signup\nTerms Of Use apply\nMaterial Published here\nok",
+    "click.here to continue\nclick  here too",
+    "Broken � char and ï¿½ mojibake and non\xa0breaking",
+    "tabs\tand\nnewlines\r\nand\x0bcontrols\x1c\x1f\x00 zero-width​ space",
+    "Unicode spaces em　ideographic line sep",
+    "[1] citation [note] and [] empty and [unclosed",
+    "Emoji 🙂 and accents éàü and ſubscribe long s",
+    "http",
+    "wwwhttp://a.b\nwww.only",
+    "https://only-a-url.com/path?q=1&r=2",
+    "Kelvin K and click HERE, Subscribe!",
+]
+
+WORDS = (
+    "the army said civilians were killed when strikes hit buildings near the border while "
+    "officials reported that aid convoys remained blocked and families fled towards shelters"
+).split()
+NOISE = [
+    "https://news.example.com/world/2023/10/article_id-123.html",
+    "www.example.org", "&amp;", "&quot;", "<br>", "<em>", "</em>", "[1]", "[citation needed]",
+    "e.g.", "U.S.", "-", "--", "_", "�", "\xa0", "\t", "\n", "Click here to read more",
+    "Subscribe to our newsletter", "Privacy Policy", "ï¿½",
+]
+
+
+def synthetic_docs(n_docs, seed=0):
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(n_docs):
+        parts = [rng.choice(NOISE) if rng.random() < 0.05 else rng.choice(WORDS) for _ in range(800)]
+        docs.append(" ".join(parts))
+    return docs
+
+
+def load_docs(n_docs, raw_base="data/raw_text"):
+    docs = []
+    for cat in ("gaza", "ukraine"):
+        cat_dir = os.path.join(raw_base, cat)
+        if os.path.isdir(cat_dir):
+            docs.extend(text for _, text in read_texts(cat_dir, n_docs))
+    if not docs:
+        print(f"[INFO] No articles in {raw_base}, using synthetic texts")
+        docs = synthetic_docs(n_docs)
+    return docs[:n_docs]
+
+
+def check_golden(docs):
+    mismatches = []
+    for text in GOLDEN_CASES + docs:
+        expected = clean_text_reference(text)
+        got = clean_text(text)
+        if got != expected:
+            mismatches.append((text[:80], expected[:80], got[:80]))
+    return mismatches
+
+
+def time_per_doc(func, docs, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in docs:
+            func(text)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(docs) if docs else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark compiled clean_text against the reference")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    docs = load_docs(args.docs)
+    mismatches = check_golden(docs)
+    print(f"[INFO] Golden check: {len(GOLDEN_CASES) + len(docs)} texts, {len(mismatches)} mismatches")
+    for text, expected, got in mismatches[:10]:
+        print(f"[ERROR] {text!r}\n  expected: {expected!r}\n  got:      {got!r}")
+
+    ref = time_per_doc(clean_text_reference, docs, args.repeat)
+    fast = time_per_doc(clean_text, docs, args.repeat)
+    print(f"\n========== RESULTS ({len(docs)} docs, best of {args.repeat}) ==========")
+    print(f"reference : {ref * 1e6:.1f} µs/doc")
+    print(f"compiled  : {fast * 1e6:.1f} µs/doc  (x{ref / fast:.1f})" if fast else "compiled  : n/a")
+    if mismatches:
+        sys.exit(1)
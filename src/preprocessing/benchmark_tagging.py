@@ -0,0 +1,70 @@
+# Benchmark de l'étiquetage POS : nltk.pos_tag document par document (ancien
+# code de lemmatize_tokens et de actor_pos_contexts) contre BatchTagger, qui
+# garde un seul tagger chargé et étiquette les documents par lots. Vérifie
+# que les étiquettes sont identiques.
+#
+#   python src/preprocessing/benchmark_tagging.py --docs 200
+import argparse
+import os
+import random
+import sys
+import time
+
+import nltk
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+from corpus_store import read_texts
+from pos_tagging import BatchTagger
+
+WORDS = (
+    "the army said civilians were killed when strikes hit buildings near the border while "
+    "officials reported that aid convoys remained blocked and families fled towards shelters"
+).split()
+
+
+def load_token_lists(n_docs, base="data/processed_clean"):
+    texts = []
+    for cat in ("gaza", "ukraine"):
+        cat_dir = os.path.join(base, cat)
+        if os.path.isdir(cat_dir):
+            texts.extend(text for _, text in read_texts(cat_dir, n_docs))
+    if not texts:
+        print(f"[INFO] No articles in {base}, using synthetic texts")
+        rng = random.Random(0)
+        texts = [" ".join(rng.choice(WORDS) for _ in range(600)) for _ in range(n_docs)]
+    return [text.split() for text in texts[:n_docs]]
+
+
+def run_benchmark(token_lists):
+    t0 = time.perf_counter()
+    before = [[tag for _, tag in nltk.pos_tag(tokens)] for tokens in token_lists]
+    t_before = time.perf_counter() - t0
+
+    tagger = BatchTagger()
+    t0 = time.perf_counter()
+    tag_arrays = tagger.tag_batch(token_lists)
+    t_after = time.perf_counter() - t0
+
+    after = [tagger.decode(ids) for ids in tag_arrays]
+    n = len(token_lists)
+    return {
+        "before_docs_per_sec": n / t_before if t_before else 0.0,
+        "after_docs_per_sec": n / t_after if t_after else 0.0,
+        "identical": before == after,
+        "tag_bytes": sum(ids.nbytes for ids in tag_arrays),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-document pos_tag against BatchTagger")
+    parser.add_argument("--docs", type=int, default=200)
+    args = parser.parse_args()
+
+    token_lists = load_token_lists(args.docs)
+    r = run_benchmark(token_lists)
+    print(f"\n========== RESULTS ({len(token_lists)} docs) ==========")
+    print(f"nltk.pos_tag per document : {r['before_docs_per_sec']:.1f} docs/s")
+    print(f"BatchTagger.tag_batch     : {r['after_docs_per_sec']:.1f} docs/s  "
+          f"(x{r['after_docs_per_sec'] / r['before_docs_per_sec']:.1f})")
+    print(f"identical tags: {r['identical']}  tag arrays: {r['tag_bytes'] / 1024:.1f} KiB")
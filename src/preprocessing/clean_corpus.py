@@ -1,62 +1,140 @@
 import os
 from glob import glob
 import sys
+import multiprocessing
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
 
 from pipeline import preprocess_to_string
+from lemmatization import LEMMA_CACHE
+from corpus_store import open_store
+from token_corpus import ensure_token_corpus, TOKEN_CORPUS_DIR
+import nltk_resources
 
-def process_category(cat, raw_base="data/raw_text", out_base="data/processed_clean"):
+# tokenisation, étiquetage POS et lemmatisation sont du Python pur : la
+# ligne de commande lance un processus par cœur ; main() appelée depuis le
+# serveur reste séquentielle (pas de Pool à chaque requête)
+WORKERS = os.cpu_count() or 1
+# articles envoyés ensemble à un worker (moins d'allers-retours entre processus)
+CHUNK_SIZE = 8
+NLTK_RESOURCES = [nltk_resources.TAGGER_MODEL, "stopwords", "wordnet", "omw-1.4"]
+WARMUP_TEXT = "The soldiers were running towards the damaged buildings near the border."
+
+def _init_worker():
+    # chargé une fois par worker : tagger, WordNet, stopwords et punkt sont
+    # chargés paresseusement par NLTK au premier appel. Le cache de lemmes est
+    # hérité du parent (fork) ou relu sur disque (spawn)
+    if not LEMMA_CACHE.entries:
+        LEMMA_CACHE.load()
+    # compteurs hérités du parent remis à zéro
+    LEMMA_CACHE.drain()
+    LEMMA_CACHE.track_new = True
+    try:
+        preprocess_to_string(WARMUP_TEXT)
+    except Exception as e:
+        print(f"[WARNING] Worker warm-up failed: {e}")
+
+def _preprocess_job(job):
+    doc_id, raw_content = job
+    try:
+        return doc_id, preprocess_to_string(raw_content), None
+    except Exception as e:
+        return doc_id, None, str(e)
+
+def _preprocess_job_in_worker(job):
+    # lemmes appris par le worker, renvoyés au parent avec le résultat
+    return _preprocess_job(job), LEMMA_CACHE.drain()
+
+def preprocess_records(jobs, workers=1, chunksize=CHUNK_SIZE, ordered=True):
+    # jobs : (id, texte brut) ; renvoie (id, texte prétraité, erreur) au fil de
+    # l'eau, dans l'ordre des jobs si `ordered`
+    if workers <= 1:
+        yield from map(_preprocess_job, jobs)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        run = pool.imap if ordered else pool.imap_unordered
+        for result, delta in run(_preprocess_job_in_worker, jobs, chunksize):
+            LEMMA_CACHE.absorb(delta)
+            yield result
+
+def process_category(cat, raw_base="data/raw_text", out_base="data/processed_clean",
+                     workers=1, chunksize=CHUNK_SIZE, ordered=True):
     raw_dir = os.path.join(raw_base, cat)
     out_dir = os.path.join(out_base, cat)
     
-    os.makedirs(out_dir, exist_ok=True)
-    
-    files = glob(os.path.join(raw_dir, "*.txt"))
+    source = open_store(raw_dir)
+    target = open_store(out_dir)
+    # .txt de l'ancien format (un fichier par article)
+    for old_path in glob(os.path.join(out_dir, "*.txt")):
+        os.remove(old_path)
+
+    # les ids d'articles sont stables : un texte traité dont la source a
+    # disparu de raw_text (doublon, ancien nom) est retiré
+    for doc_id in target.ids():
+        if doc_id not in source:
+            target.delete(doc_id)
 
-    if not files:
-        print(f"[WARNING] No files found in {raw_dir}")
+    if not len(source):
+        print(f"[WARNING] No articles found in {raw_dir}")
+        target.flush()
         return
 
-    print(f"[INFO] Processing {len(files)} files for category '{cat}'...")
+    print(f"[INFO] Processing {len(source)} articles for category '{cat}' ({workers} worker(s))...")
     successful = 0
     failed = 0
 
-    for fpath in files:
-        try:
-            with open(fpath, "r", encoding="utf-8") as f:
-                raw_content = f.read()
-            
-            # Preprocess
-            text = preprocess_to_string(raw_content)
-
-            if text:
-                filename = os.path.basename(fpath)
-                out_file_path = os.path.join(out_dir, filename)
-                
-                with open(out_file_path, "w", encoding="utf-8") as f_out:
-                    f_out.write(text)
-                
-                successful += 1
-            else:
-                print(f"[WARNING] No tokens after preprocessing: {os.path.basename(fpath)}")
-
-        except Exception as e:
+    jobs = ((doc_id, record["text"]) for doc_id, record in source.items())
+    for doc_id, text, error in preprocess_records(jobs, workers, chunksize, ordered):
+        if error is not None:
             failed += 1
-            print(f"[ERROR] Failed to process {fpath}: {e}")
+            print(f"[ERROR] Failed to process {cat}/{doc_id}: {error}")
+        elif text:
+            target.put(doc_id, {"id": doc_id, "text": text})
+            successful += 1
+        else:
+            print(f"[WARNING] No tokens after preprocessing: {doc_id}")
 
+    target.flush()
+    if target.dead_bytes() > target.shard_max_bytes:
+        target.compact()
     print(f"[INFO] Category '{cat}': {successful} successful, {failed} failed")
-    print(f"[INFO] Saved processed files to {out_dir}")
+    print(f"[INFO] Saved processed articles to {out_dir}")
 
 
-def main():
+def main(workers=1, ordered=True, download_nltk=None):
     categories = ["gaza", "ukraine"]
+    # vérifiées (et téléchargées si besoin) une fois avant de lancer les
+    # workers ; sans punkt, la tokenisation retombe sur split()
+    nltk_resources.ensure(*NLTK_RESOURCES, download=download_nltk)
+    try:
+        nltk_resources.ensure(nltk_resources.PUNKT, download=download_nltk)
+    except LookupError as e:
+        print(f"[WARNING] {e}; tokenizing with str.split()")
+    loaded = LEMMA_CACHE.load()
+    print(f"[INFO] Lemma cache: {loaded} entries loaded")
+    
+    for cat in categories:
+        process_category(cat, workers=workers, ordered=ordered)
     
+    # corpus compilé (ids de tokens en mmap) lu par les analyses
     for cat in categories:
-        process_category(cat)
+        ensure_token_corpus(os.path.join("data/processed_clean", cat), os.path.join(TOKEN_CORPUS_DIR, cat))
     
+    LEMMA_CACHE.save()
+    stats = LEMMA_CACHE.stats()
+    print(f"[INFO] Lemma cache: {stats['size']} entries, hit rate {stats['hit_rate']:.1%} "
+          f"({stats['hits']} hits, {stats['misses']} WordNet lookups)")
     print("[DONE] Corpus cleaned and built!")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Preprocess data/raw_text into data/processed_clean")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Worker processes (1 = sequential)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="Write articles as soon as they are ready instead of in store order")
+    parser.add_argument("--no-download-nltk", dest="download_nltk", action="store_false", default=None,
+                        help="Fail on missing NLTK resources instead of downloading them")
+    args = parser.parse_args()
+    main(workers=args.workers, ordered=not args.unordered, download_nltk=args.download_nltk)
@@ -10,7 +10,75 @@ BOILERPLATE_PATTERNS = [
     r'newsletter.*',
 ]
 
+
+class _PrintableTable(dict):
+    # table pour str.translate : caractère non imprimable -> espace ; chaque
+    # caractère n'est testé qu'une fois, les suivants sont des lookups en C
+    def __missing__(self, codepoint):
+        value = codepoint if chr(codepoint).isprintable() else 0x20
+        self[codepoint] = value
+        return value
+
+
+class TextCleaner:
+    """Version compilée de clean_text_reference, à sortie identique.
+
+    - URLs et suites de `_-.` : une seule passe (une URL ne commence jamais
+      par un de ces caractères, et la suppression des balises, faite ensuite,
+      n'en dépend pas) ;
+    - règles de boilerplate fusionnées en une alternance : chaque règle est
+      un littéral suivi de `.*` (jusqu'à la fin de ligne), appliquer la plus
+      à gauche revient à les appliquer l'une après l'autre, aux espaces près ;
+    - espaces puis caractères non imprimables : split/join, et la table
+      translate seulement s'il reste des caractères non imprimables (tous
+      les blancs sauf ' ' le sont, le résultat est le même).
+    Les passes sur `<`, `[` et le mojibake ne sont faites que si nécessaire ;
+    les lookaheads en tête des regex évitent d'essayer chaque alternative à
+    chaque position.
+    """
+
+    def __init__(self, boilerplate_patterns=BOILERPLATE_PATTERNS):
+        self.url_or_punct = re.compile(r'(?=[hw_\-.])(?:http\S+|www\.\S+|[_\-.]+)')
+        self.tags = re.compile(r'<[^>]+>')
+        merged = "|".join(f"(?:{p})" for p in boilerplate_patterns)
+        first_chars = {p[0] for p in boilerplate_patterns}
+        if all(c.isalnum() for c in first_chars):
+            # avec IGNORECASE la classe couvre aussi majuscules et variantes (ſ)
+            merged = f"(?=[{''.join(sorted(first_chars))}])(?:{merged})"
+        self.boilerplate = re.compile(merged, re.IGNORECASE)
+        self.brackets = re.compile(r'\[[^\]]+\]')
+        self.table = _PrintableTable()
+
+    def __call__(self, text: str) -> str:
+        if not text:
+            return ""
+
+        text = html.unescape(text)
+        text = self.url_or_punct.sub(' ', text)
+        if '<' in text:
+            text = self.tags.sub(' ', text)
+        text = self.boilerplate.sub(' ', text)
+        if '[' in text:
+            text = self.brackets.sub(' ', text)
+        if 'ï¿½' in text:
+            text = text.replace('ï¿½', ' ')
+        if '\ufffd' in text:
+            text = text.replace('\ufffd', ' ')
+        text = ' '.join(text.split())
+        if not text.isprintable():
+            text = ' '.join(text.translate(self.table).split())
+        return text
+
+
+_cleaner = TextCleaner()
+
+
 def clean_text(text: str) -> str:
+    return _cleaner(text)
+
+
+def clean_text_reference(text: str) -> str:
+    # implémentation d'origine, gardée comme référence (benchmark_clean_text.py)
     if not text:
         return ""
 
@@ -28,7 +96,7 @@ def clean_text(text: str) -> str:
     text = re.sub(r'\[[^\]]+\]', ' ', text)
 
     text = (
-        text.replace('\ufffd', ' ')
+        text.replace('�', ' ')
             .replace('ï¿½', ' ')
             .replace('\xa0', ' ')
     )
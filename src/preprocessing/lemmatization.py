@@ -1,49 +1,165 @@
-import nltk
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import wordnet
-
-def download_nltk_data():
-    resources = [
-        ('corpora/wordnet', 'wordnet'),
-        ('corpora/omw-1.4', 'omw-1.4'),
-        ('taggers/averaged_perceptron_tagger', 'averaged_perceptron_tagger'),
-    ]
-
-    for path, name in resources:
+import os
+import sys
+import json
+from collections import OrderedDict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+import nltk_resources
+from pos_tagging import TAGGER
+
+LEMMA_CACHE_PATH = "./data/cache/lemmas.json"
+LEMMA_CACHE_SIZE = 200_000
+
+# constantes POS de WordNet (nltk.corpus.reader.wordnet), sans importer nltk
+ADJ, NOUN, VERB, ADV = 'a', 'n', 'v', 'r'
+
+WN_TAGS = {
+    'J': ADJ,
+    'N': NOUN,
+    'V': VERB,
+    'R': ADV
+}
+
+
+def _wordnet_version():
+    try:
+        return nltk_resources.wordnet_version()
+    except LookupError:
+        return None
+
+
+class LemmaCache:
+    """Cache LRU borné (mot, POS WordNet) -> lemme.
+
+    Le vocabulaire de presse est très zipfien : les mêmes paires reviennent
+    d'un article à l'autre, morphy n'est appelé qu'au premier passage. Ce qui
+    a été appris depuis le dernier drain() (paires, hits, misses) est renvoyé
+    par les workers au processus principal, qui l'intègre (absorb) et
+    sauvegarde le cache sur disque.
+    """
+
+    def __init__(self, max_size=LEMMA_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.new = {}
+        self.hits = 0
+        self.misses = 0
+        self._drained = (0, 0)
+        # activé dans les workers seulement (voir clean_corpus._init_worker)
+        self.track_new = False
+
+    def lemmatize(self, word, pos):
+        key = (word, pos)
+        lemma = self.entries.get(key)
+        if lemma is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return lemma
+        self.misses += 1
+        lemma = nltk_resources.lemmatizer().lemmatize(word, pos)
+        self._store(key, lemma)
+        if self.track_new:
+            self.new[key] = lemma
+        return lemma
+
+    def _store(self, key, lemma):
+        self.entries[key] = lemma
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def drain(self):
+        new, self.new = self.new, {}
+        hits, misses = self.hits - self._drained[0], self.misses - self._drained[1]
+        self._drained = (self.hits, self.misses)
+        return {"lemmas": new, "hits": hits, "misses": misses}
+
+    def absorb(self, delta):
+        self.merge(delta["lemmas"])
+        self.hits += delta["hits"]
+        self.misses += delta["misses"]
+
+    def merge(self, entries):
+        for key, lemma in entries.items():
+            self._store(key, lemma)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def load(self, path=LEMMA_CACHE_PATH):
+        if not os.path.exists(path):
+            return 0
         try:
-            nltk.data.find(path)
-        except LookupError:
-            nltk.download(name)
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[WARNING] Cannot read lemma cache {path}: {e}")
+            return 0
+        # lemmes calculés avec une autre version de WordNet : on repart de zéro
+        if data.get("wordnet") != _wordnet_version():
+            print(f"[INFO] Lemma cache {path} built with another WordNet version, ignored")
+            return 0
+        self.merge({(word, pos): lemma for word, pos, lemma in data["lemmas"]})
+        return len(data["lemmas"])
+
+    def save(self, path=LEMMA_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "wordnet": _wordnet_version(),
+                "lemmas": [[word, pos, lemma] for (word, pos), lemma in self.entries.items()],
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+# partagé par tous les documents du processus
+LEMMA_CACHE = LemmaCache()
+
+
+def _lemmatize(cache, word, wn_tag):
+    try:
+        return cache.lemmatize(word, wn_tag)
+    except Exception as e:
+        print(f"[WARNING] Lemmatization failed for '{word}': {e}")
+        return word
 
-download_nltk_data()
 
-def lemmatize_tokens(tokens):
+def lemmatize_tokens(tokens, cache=LEMMA_CACHE, tagger=TAGGER):
 
     if not tokens:
         return []
 
-    lemmatizer = WordNetLemmatizer()
-    
     try:
-        pos_tags = nltk.pos_tag(tokens)
+        pos_tags = tagger.pos_tag(tokens)
     except Exception as e:
         print(f"[WARNING] POS tagging failed: {e}. Using default lemmatization.")
-        return [lemmatizer.lemmatize(token, wordnet.NOUN) for token in tokens]
+        return [cache.lemmatize(token, NOUN) for token in tokens]
 
-    lemmas = []
-    for word, tag in pos_tags:
-        wn_tag = {
-            'J': wordnet.ADJ,
-            'N': wordnet.NOUN,
-            'V': wordnet.VERB,
-            'R': wordnet.ADV
-        }.get(tag[0], wordnet.NOUN)
+    return [_lemmatize(cache, word, WN_TAGS.get(tag[0], NOUN)) for word, tag in pos_tags]
 
-        try:
-            lemma = lemmatizer.lemmatize(word, wn_tag)
-            lemmas.append(lemma)
-        except Exception as e:
-            print(f"[WARNING] Lemmatization failed for '{word}': {e}")
-            lemmas.append(word)
 
-    return lemmas
\ No newline at end of file
+def iter_lemmas(tokens, cache=LEMMA_CACHE, tagger=TAGGER):
+    # version paresseuse de lemmatize_tokens (mêmes lemmes, dans le même
+    # ordre) : étiquetage et lemmatisation s'arrêtent quand on arrête d'itérer
+    if not tokens:
+        return
+
+    try:
+        tagger.load()
+    except Exception as e:
+        print(f"[WARNING] POS tagging failed: {e}. Using default lemmatization.")
+        for token in tokens:
+            yield cache.lemmatize(token, NOUN)
+        return
+
+    tagset = tagger.tagset
+    for word, tag_id in zip(tokens, tagger.iter_tag_ids(tokens)):
+        yield _lemmatize(cache, word, WN_TAGS.get(tagset[tag_id][0], NOUN))
@@ -1,10 +1,15 @@
+import os
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+import sys
+import functools
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+import nltk_resources
+
+@functools.lru_cache(maxsize=None)
 def get_custom_stopwords(language='english'):
-    stop_words = set(stopwords.words(language))
+    stop_words = nltk_resources.stopword_set(language)
 
     domain_stopwords = {
         "say", "says", "said",
@@ -31,6 +36,7 @@ def normalize_text(text, language='english'):
     text = re.sub(r"\s+", " ", text).strip()
 
     try:
+        from nltk.tokenize import word_tokenize
         tokens = word_tokenize(text)
     except Exception as e:
         print(f"[WARNING] Tokenization failed: {e}")
@@ -1,6 +1,8 @@
+from itertools import islice
+
 from clean_text import clean_text
 from normalize import normalize_text
-from lemmatization import lemmatize_tokens
+from lemmatization import lemmatize_tokens, iter_lemmas
 
 def preprocess_pipeline(text, language='english'):
     cleaned_text = clean_text(text)
@@ -9,39 +11,66 @@ def preprocess_pipeline(text, language='english'):
     return lemmatized_tokens
 
 
+def keep_token(token, min_token_length=2, preserve_hyphenated=True, filter_numbers=True):
+    if len(token) < min_token_length:
+        return False
+
+    if filter_numbers and (token.isdigit() or token.replace('.', '', 1).isdigit()):
+        return False
+
+    if preserve_hyphenated:
+        return token.replace('-', '').isalpha()
+    return token.isalpha()
+
+
+def iter_preprocessed_tokens(
+    text,
+    language='english',
+    min_token_length=2,
+    preserve_hyphenated=True,
+    filter_numbers=True
+):
+    # nettoyage et tokenisation sur tout le texte (peu coûteux), puis
+    # étiquetage, lemmatisation et filtrage token par token, à la demande
+    cleaned_text = clean_text(text)
+    tokens = normalize_text(cleaned_text, language)
+    for token in iter_lemmas(tokens):
+        if keep_token(token, min_token_length, preserve_hyphenated, filter_numbers):
+            yield token
+
+
 def preprocess_to_string(
     text,
     language='english',
     min_token_length=2,
     max_tokens=950,
     preserve_hyphenated=True,
-    filter_numbers=True
+    filter_numbers=True,
+    lazy=True
 ):
     if not text or not text.strip():
         return ""
     
+    if lazy:
+        # on s'arrête dès que le budget est atteint (un token de plus pour
+        # savoir s'il y a troncature) : même sortie, sans étiqueter ni
+        # lemmatiser la fin des longs articles (live blogs)
+        tokens = iter_preprocessed_tokens(text, language, min_token_length, preserve_hyphenated, filter_numbers)
+        filtered_tokens = list(islice(tokens, max_tokens + 1))
+        if len(filtered_tokens) > max_tokens:
+            print(f"[INFO] Token budget reached, truncating to {max_tokens}")
+            filtered_tokens = filtered_tokens[:max_tokens]
+        return " ".join(filtered_tokens)
+
     tokens = preprocess_pipeline(text, language)
     
-    filtered_tokens = []
-    for token in tokens:
-        if len(token) < min_token_length:
-            continue
-        
-        if filter_numbers and (token.isdigit() or token.replace('.', '', 1).isdigit()):
-            continue
-        
-        if preserve_hyphenated:
-            if not (token.replace('-', '').isalpha()):
-                continue
-        else:
-            if not token.isalpha():
-                continue
-        
-        filtered_tokens.append(token)
+    filtered_tokens = [
+        token for token in tokens
+        if keep_token(token, min_token_length, preserve_hyphenated, filter_numbers)
+    ]
     
     if len(filtered_tokens) > max_tokens:
         print(f"[INFO] Truncating {len(filtered_tokens)} tokens to {max_tokens}")
         filtered_tokens = filtered_tokens[:max_tokens]
     
     return " ".join(filtered_tokens)
-
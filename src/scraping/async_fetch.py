@@ -0,0 +1,197 @@
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import functions
+from corpus_store import flush_stores
+from functions import extract_article, get_domain, save_article, configure_sessions, open_store, SkippedPage
+from http_cache import HttpCache
+from manifest import content_sha1
+from link_ledger import LinkLedger
+from resilience import DomainHealth
+from html_archive import HTML_ARCHIVE_DIR, compact_archive
+
+# Limites de concurrence : globale et par domaine (pour ne pas surcharger un média)
+MAX_CONCURRENCY = 16
+PER_DOMAIN_CONCURRENCY = 4
+
+
+def new_statistics(total):
+    return {"total": total, "successful": 0, "failed": 0, "aborted": {}, "details": {}}
+
+
+def domain_details(statistics, media):
+    if media not in statistics["details"]:
+        statistics["details"][media] = {"successful": 0, "failed": 0}
+    return statistics["details"][media]
+
+
+def record_result(statistics, url, article):
+    media = article["media"] if article else get_domain(url)
+    if article:
+        statistics["successful"] += 1
+        domain_details(statistics, media)["successful"] += 1
+    else:
+        statistics["failed"] += 1
+        domain_details(statistics, media)["failed"] += 1
+
+
+def store_result(statistics, url, article, output_dir, manifest=None, category=None):
+    # renvoie l'id de l'article si son JSON brut a été (ré)écrit, sinon None
+    if isinstance(article, SkippedPage):
+        # page abandonnée (non HTML, trop grosse) : ni succès ni échec
+        aborted = statistics.setdefault("aborted", {})
+        aborted[article.reason] = aborted.get(article.reason, 0) + 1
+        if manifest is not None:
+            manifest.record_skip(url, category, article.reason)
+        return None
+    written = None
+    if manifest is None:
+        if article:
+            written = save_article(article, output_dir)
+    elif article:
+        sha1 = content_sha1(article["content"])
+        if manifest.is_unchanged(url, sha1, output_dir):
+            # même contenu que la dernière fois : pas de réécriture, donc pas
+            # de retraitement par build_corpus
+            statistics["unchanged"] = statistics.get("unchanged", 0) + 1
+        else:
+            old_id = manifest.article_id(url)
+            written = save_article(article, output_dir)
+            if old_id and old_id != written:
+                # ancien nom basé sur hash() : on ne garde qu'une copie
+                remove_raw_article(output_dir, old_id)
+            manifest.record_success(url, category, written, sha1, article["fetched_at"])
+    else:
+        manifest.record_failure(url, category)
+    record_result(statistics, url, article)
+    return written
+
+
+def remove_raw_article(output_dir, article_id):
+    open_store(output_dir).delete(article_id)
+
+
+def select_links(links, output_dir, manifest, refresh=False):
+    # sans refresh, un lien déjà récupéré avec succès n'est pas retéléchargé ;
+    # avec refresh, il est revalidé (GET conditionnel via le cache HTTP)
+    if manifest is None or refresh:
+        return links
+    return [url for url in links if manifest.needs_fetch(url, output_dir)]
+
+
+async def _fetch_one(loop, executor, url, links_file, cache, ledger, health, archive, global_sem, domain_sems):
+    # on prend d'abord le slot du domaine : une tâche bloquée sur un domaine
+    # saturé ne doit pas occuper un slot global
+    async with domain_sems[get_domain(url)]:
+        async with global_sem:
+            try:
+                article = await loop.run_in_executor(executor, extract_article, url, links_file, cache, ledger,
+                                                     health, archive)
+            except Exception as e:
+                print(f"[UNEXPECTED ERROR] {url}: {e}")
+                article = None
+            return url, article
+
+
+async def fetch_all(links, links_file, output_dir,
+                    max_concurrency=MAX_CONCURRENCY,
+                    per_domain=PER_DOMAIN_CONCURRENCY,
+                    cache=None, manifest=None, category=None, statistics=None, ledger=None,
+                    health=None, archive=None):
+    if statistics is None:
+        statistics = new_statistics(len(links))
+    if not links:
+        return statistics
+
+    # chaque domaine peut avoir `per_domain` requêtes en vol : le pool de la
+    # session doit pouvoir garder autant de connexions ouvertes
+    if per_domain > functions.POOL_MAXSIZE:
+        configure_sessions(pool_maxsize=per_domain)
+
+    loop = asyncio.get_running_loop()
+    global_sem = asyncio.Semaphore(max_concurrency)
+    domain_sems = defaultdict(lambda: asyncio.Semaphore(per_domain))
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        tasks = [
+            asyncio.ensure_future(_fetch_one(loop, executor, url, links_file, cache, ledger, health, archive,
+                                            global_sem, domain_sems))
+            for url in links
+        ]
+        for fut in asyncio.as_completed(tasks):
+            url, article = await fut
+            store_result(statistics, url, article, output_dir, manifest, category)
+
+    return statistics
+
+
+def run_coroutine(coro):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # appelé depuis une boucle déjà active (ex: tâche de fond FastAPI) :
+    # on exécute notre propre boucle dans un thread dédié
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, coro).result()
+
+
+def finish_run(statistics, links_file, cache, manifest, ledger, health=None, archive=None):
+    if health:
+        # latence, retries et erreurs par domaine, à côté des compteurs
+        # d'articles (statistics["aborted"] est compté par store_result)
+        for media, counters in health.stats().items():
+            domain_details(statistics, media).update(counters)
+    if ledger:
+        # une seule réécriture du fichier de liens pour tout le run
+        removed = ledger.apply(links_file)
+        statistics["dead_links"] = {"removed": removed, **ledger.stats(links_file)}
+    if cache:
+        cache.save()
+        statistics["cache"] = cache.stats()
+    if manifest:
+        manifest.save()
+    if archive is not None:
+        compact_archive(archive)
+    # l'index du store n'est écrit qu'une fois par run
+    flush_stores()
+    return statistics
+
+
+def scrape_links(links, links_file, output_dir,
+                 max_concurrency=MAX_CONCURRENCY,
+                 per_domain=PER_DOMAIN_CONCURRENCY,
+                 use_cache=True, manifest=None, category=None, refresh=False,
+                 use_ledger=True, use_archive=True):
+    cache = HttpCache() if use_cache else None
+    ledger = LinkLedger() if use_ledger else None
+    health = DomainHealth()
+    archive = open_store(HTML_ARCHIVE_DIR) if use_archive else None
+    statistics = new_statistics(len(links))
+    todo = select_links(links, output_dir, manifest, refresh)
+    statistics["skipped"] = len(links) - len(todo)
+    if statistics["skipped"]:
+        print(f"[INFO] {statistics['skipped']} links already fetched, {len(todo)} to fetch")
+
+    run_coroutine(fetch_all(todo, links_file, output_dir, max_concurrency, per_domain,
+                   cache, manifest, category, statistics, ledger, health, archive))
+    return finish_run(statistics, links_file, cache, manifest, ledger, health, archive)
+
+
+def scrape_links_sequential(links, links_file, output_dir,
+                            use_cache=True, manifest=None, category=None, refresh=False,
+                            use_ledger=True, use_archive=True):
+    cache = HttpCache() if use_cache else None
+    ledger = LinkLedger() if use_ledger else None
+    health = DomainHealth()
+    archive = open_store(HTML_ARCHIVE_DIR) if use_archive else None
+    statistics = new_statistics(len(links))
+    todo = select_links(links, output_dir, manifest, refresh)
+    statistics["skipped"] = len(links) - len(todo)
+
+    for url in todo:
+        article = extract_article(url, links_file, cache, ledger, health, archive)
+        store_result(statistics, url, article, output_dir, manifest, category)
+    return finish_run(statistics, links_file, cache, manifest, ledger, health, archive)
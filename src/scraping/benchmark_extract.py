@@ -0,0 +1,104 @@
+# Benchmark des backends d'extraction HTML (pages/s) sur un jeu de pages
+# sauvegardées, avec vérification que chaque backend produit le même
+# titre/contenu que le backend de référence (bs4).
+#
+#   python src/scraping/benchmark_extract.py --fixtures data/html_fixtures
+#   python src/scraping/benchmark_extract.py --fetch data/gaza_links.txt --limit 50
+import argparse
+import os
+import time
+from glob import glob
+
+from extractors import EXTRACTORS, extract_title_paragraphs
+from functions import read_links, get_session, article_id
+
+FIXTURES_DIR = "./data/html_fixtures"
+
+
+def save_fixtures(links_file, fixtures_dir, limit=50):
+    os.makedirs(fixtures_dir, exist_ok=True)
+    saved = 0
+    for url in read_links(links_file)[:limit]:
+        try:
+            r = get_session(url).get(url, timeout=12)
+            r.raise_for_status()
+        except Exception as e:
+            print(f"[ERROR] Cannot fetch {url}: {e}")
+            continue
+        with open(os.path.join(fixtures_dir, f"{article_id(url)}.html"), "w", encoding="utf-8") as f:
+            f.write(r.text)
+        saved += 1
+    print(f"[INFO] Saved {saved} fixture pages to {fixtures_dir}")
+
+
+def synthetic_pages(n=50):
+    # pages "news" synthétiques si aucune fixture n'a été sauvegardée
+    pages = []
+    for i in range(n):
+        nav = "".join(f"<li><a href='/s{j}'>Section {j}</a></li>" for j in range(200))
+        body = "".join(
+            f"<p>Paragraph {j} of article {i}, with <a href='#'>a link</a> and <b>bold</b> text "
+            + "lorem ipsum dolor sit amet " * 15 + "</p>"
+            for j in range(40)
+        )
+        scripts = "<script>var data = {" + ",".join(f"k{j}: {j}" for j in range(500)) + "};</script>"
+        pages.append(f"<html><head><title>Article {i}</title>{scripts}</head>"
+                     f"<body><nav><ul>{nav}</ul></nav><article>{body}</article></body></html>")
+    # HTML mal formé : <p> non fermés ou contenant des blocs
+    pages.append("<html><body><p>first<p>second</body></html>")
+    pages.append("<html><body><p>before<div>inside</div>after</p></body></html>")
+    pages.append("<html><body><p>t<table><tr><td>cell</td></tr></table>u</p></body></html>")
+    return pages
+
+
+def load_pages(fixtures_dir):
+    pages = []
+    for path in sorted(glob(os.path.join(fixtures_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    return pages
+
+
+def run_benchmark(pages, repeat=3):
+    reference = [extract_title_paragraphs(html, "bs4") for html in pages]
+    results = {}
+    for name in EXTRACTORS:
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            outputs = [extract_title_paragraphs(html, name) for html in pages]
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        identical = sum(
+            1 for (t, ps), (rt, rps) in zip(outputs, reference)
+            if t == rt and "\n".join(ps) == "\n".join(rps)
+        )
+        results[name] = {
+            "pages_per_sec": len(pages) / best if best else 0.0,
+            "identical": identical,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction backends")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Folder of saved *.html pages")
+    parser.add_argument("--fetch", help="Links file to download fixture pages from first")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.fetch:
+        save_fixtures(args.fetch, args.fixtures, args.limit)
+
+    pages = load_pages(args.fixtures)
+    if not pages:
+        print(f"[INFO] No fixtures in {args.fixtures}, using synthetic pages")
+        pages = synthetic_pages()
+
+    res = run_benchmark(pages, args.repeat)
+    print(f"\n========== RESULTS ({len(pages)} pages) ==========")
+    for name, r in res.items():
+        print(f"{name:>11}: {r['pages_per_sec']:8.1f} pages/s   identical to bs4: {r['identical']}/{len(pages)}")
+    if any(r["identical"] < len(pages) for r in res.values()):
+        print("[WARNING] Some backends differ from bs4: keep the default (bs4) for the corpus")
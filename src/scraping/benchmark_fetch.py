@@ -0,0 +1,112 @@
+# Benchmark du scraping séquentiel vs asynchrone contre des serveurs HTTP locaux.
+# Chaque serveur "stub" écoute sur son propre port (= un domaine distinct pour
+# get_domain) et simule la latence réseau d'un média.
+#
+#   python src/scraping/benchmark_fetch.py --links 200 --domains 8 --latency 0.2
+import argparse
+import os
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from async_fetch import scrape_links, scrape_links_sequential
+
+ARTICLE_HTML = (
+    "<html><head><title>Stub article {n}</title></head><body>"
+    + "".join(f"<p>Paragraph {i} " + "lorem ipsum dolor sit amet " * 10 + "</p>" for i in range(8))
+    + "</body></html>"
+)
+
+
+def make_handler(latency):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            etag = f'"{self.path}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = ARTICLE_HTML.format(n=self.path).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_servers(n_domains, latency):
+    servers = []
+    for _ in range(n_domains):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def run_benchmark(n_links=200, n_domains=8, latency=0.2, max_concurrency=16, per_domain=4):
+    servers = start_stub_servers(n_domains, latency)
+    links = [
+        f"http://127.0.0.1:{servers[i % n_domains].server_address[1]}/article/{i}"
+        for i in range(n_links)
+    ]
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            links_file = os.path.join(tmp, "links.txt")
+            with open(links_file, "w", encoding="utf-8") as f:
+                f.write("\n".join(links) + "\n")
+
+            for mode in ("sequential", "async"):
+                out_dir = os.path.join(tmp, mode)
+                os.makedirs(out_dir, exist_ok=True)
+                t0 = time.perf_counter()
+                # sans cache HTTP, journal ni archive : on mesure le réseau, pas les 304
+                if mode == "sequential":
+                    stats = scrape_links_sequential(links, links_file, out_dir,
+                                                    use_cache=False, use_ledger=False, use_archive=False)
+                else:
+                    stats = scrape_links(links, links_file, out_dir, max_concurrency, per_domain,
+                                         use_cache=False, use_ledger=False, use_archive=False)
+                elapsed = time.perf_counter() - t0
+                results[mode] = {
+                    "seconds": elapsed,
+                    "pages_per_sec": n_links / elapsed if elapsed else 0.0,
+                    "successful": stats["successful"],
+                    "failed": stats["failed"],
+                }
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs async article fetching")
+    parser.add_argument("--links", type=int, default=200)
+    parser.add_argument("--domains", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated server latency (seconds)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-domain", type=int, default=4)
+    args = parser.parse_args()
+
+    res = run_benchmark(args.links, args.domains, args.latency, args.concurrency, args.per_domain)
+    print("\n========== RESULTS ==========")
+    for mode, r in res.items():
+        print(f"{mode:>10}: {r['seconds']:.2f}s  {r['pages_per_sec']:.1f} pages/s  "
+              f"(ok={r['successful']}, failed={r['failed']})")
+    if res["async"]["seconds"]:
+        print(f"   speedup: x{res['sequential']['seconds'] / res['async']['seconds']:.1f}")
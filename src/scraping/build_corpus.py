@@ -1,12 +1,23 @@
 import os
 import json
 import hashlib
+import re
 from glob import glob
-from scrape_ukrain import main_ukrain
-from scrape_gaza import main_gaza
+from scrape_ukrain import main_ukrain, LINKS_FILE as UKRAINE_LINKS
+from scrape_gaza import main_gaza, LINKS_FILE as GAZA_LINKS
+from functions import article_id as stable_article_id, open_store, find_cross_category
+from manifest import FetchManifest
+from http_cache import HttpCache
+from html_archive import reextract_category, compact_archive, HTML_ARCHIVE_DIR
+from near_duplicates import (
+    MinHasher, SignatureCache, shingle_hashes, is_empty_signature, find_clusters, JACCARD_THRESHOLD
+)
 
 RAW_BASE = "data/raw"
 OUT_BASE = "data/raw_text"
+SIGNATURES_PATH = os.path.join(RAW_BASE, "_minhash.npz")
+NEAR_DUP_THRESHOLD = JACCARD_THRESHOLD
+MIN_WORDS = 100
 
 os.makedirs(OUT_BASE, exist_ok=True)
 
@@ -16,78 +27,299 @@ def normalize(text):
 def hash_text(text):
     return hashlib.sha1(text.encode("utf-8")).hexdigest()
 
-def process_category(cat):
+STABLE_ID_RE = re.compile(r"^[0-9a-f]{16}$")
+
+def migrate_legacy_ids(cat, manifest=None):
+    # ancien format : un JSON indenté par article dans data/raw/<cat>, nommé
+    # abs(hash(url)) (différent à chaque processus) ou par l'id stable. On les
+    # importe dans le store sous l'id stable (une seule copie par URL)
     raw_dir = os.path.join(RAW_BASE, cat)
-    out_dir = os.path.join(OUT_BASE, cat)
-    os.makedirs(out_dir, exist_ok=True)
+    files = [p for p in glob(os.path.join(raw_dir, "*.json")) if not os.path.basename(p).startswith("_")]
+    if not files:
+        return
+    store = open_store(raw_dir)
+    imported = removed = 0
+    for fpath in sorted(files):
+        stem = os.path.splitext(os.path.basename(fpath))[0]
+        try:
+            with open(fpath, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+            new_id = stable_article_id(obj["url"])
+            if new_id in store:
+                removed += 1
+            else:
+                obj["id"] = new_id
+                store.put(new_id, obj)
+                imported += 1
+            os.remove(fpath)
+            if manifest is not None:
+                entry = manifest.get(obj["url"])
+                if entry and entry.get("id") == stem:
+                    entry["id"] = new_id
+        except Exception as e:
+            print(f"[ERROR] Failed migrating {fpath}: {e}")
+    store.flush()
+    print(f"[INFO] {cat}: imported {imported} raw JSON files into the store, removed {removed} duplicate copies")
 
-    files = glob(os.path.join(raw_dir, "*.json"))
-    seen_hashes = set()
-    saved = 0
-    duplicates = 0
-    errors = 0
-    
+def remove_legacy_texts(out_dir):
+    # .txt de l'ancien format (un fichier par article), remplacés par le store
+    for old_txt in glob(os.path.join(out_dir, "*.txt")):
+        os.remove(old_txt)
+
+def load_previous_stats(out_dir):
+    path = os.path.join(out_dir, "_stats.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[WARNING] Cannot read {path}, rebuilding from scratch: {e}")
+        return None
+
+def remove_output(out_dir, st):
+    if st.get("status") == "saved" and st.get("id"):
+        open_store(out_dir).delete(st["id"])
+
+def summarize(files_state):
+    # agrégats recalculés depuis l'état par fichier gardé dans _stats.json,
+    # sans relire les fichiers du corpus
     stats = {
-        "total_files": len(files),
+        "total_files": len(files_state),
         "saved": 0,
         "duplicates": 0,
+        "near_duplicates": 0,
         "errors": 0,
         "word_counts": []
     }
+    for st in files_state.values():
+        if st["status"] == "saved":
+            stats["saved"] += 1
+            stats["word_counts"].append(st["words"])
+        elif st["status"] == "duplicate":
+            stats["duplicates"] += 1
+        elif st["status"] == "near_duplicate":
+            stats["near_duplicates"] += 1
+        else:
+            stats["errors"] += 1
+    stats["avg_words"] = sum(stats["word_counts"]) / len(stats["word_counts"]) if stats["word_counts"] else 0
+    return stats
 
-    for fpath in files:
-        try:
-            with open(fpath, "r", encoding="utf-8") as f:
-                obj = json.load(f)
+def detect_near_duplicates(categories=("gaza", "ukraine"), threshold=NEAR_DUP_THRESHOLD, incremental=True):
+    # MinHash + LSH sur tout le corpus brut (les deux catégories ensemble) :
+    # les dépêches reprises par plusieurs médias ne diffèrent souvent que
+    # d'une signature ou d'un chapeau, le sha1 exact ne les voit pas
+    hasher = MinHasher()
+    cache = SignatureCache(SIGNATURES_PATH)
+    if not incremental:
+        cache.entries.clear()
 
-            text = normalize(obj.get("content", ""))
-            
-            if len(text.split()) < 100:  # Minimum word count
-                print(f"[WARNING] Skipping short article: {fpath}")
-                errors += 1
+    keys, sigs, preferred = [], [], set()
+    # toutes les signatures à garder, articles trop courts (signature vide)
+    # compris : sinon elles seraient recalculées à chaque run
+    cached = []
+    for cat in categories:
+        previous = load_previous_stats(os.path.join(OUT_BASE, cat)) if incremental else None
+        saved = {name for name, st in (previous or {}).get("files", {}).items() if st["status"] == "saved"}
+        store = open_store(os.path.join(RAW_BASE, cat))
+        for name in sorted(store.ids()):
+            key = f"{cat}/{name}"
+            version = store.doc_version(name)
+            sig = cache.get(key, version)
+            if sig is None:
+                try:
+                    text = normalize(store.get(name).get("content", ""))
+                except Exception as e:
+                    print(f"[ERROR] Failed reading {key}: {e}")
+                    continue
+                # article trop court : signature vide, il sera écarté de toute façon
+                hashes = shingle_hashes(text) if len(text.split()) >= MIN_WORDS else []
+                sig = hasher.signature(hashes)
+                cache.put(key, version, sig)
+            cached.append(key)
+            if is_empty_signature(sig):
                 continue
+            keys.append(key)
+            sigs.append(sig)
+            if name in saved:
+                preferred.add(key)
+    cache.save(cached)
 
-            h = hash_text(text)
-            if h in seen_hashes:
-                duplicates += 1
-                continue
+    clusters = find_clusters(keys, sigs, threshold, preferred)
+    drop = {cat: set() for cat in categories}
+    for cluster in clusters:
+        for key in cluster["members"]:
+            if key != cluster["representative"]:
+                cat, name = key.split("/", 1)
+                drop[cat].add(name)
+    n_dropped = sum(len(v) for v in drop.values())
+    print(f"[INFO] Near-duplicates (Jaccard >= {threshold}): {len(clusters)} clusters, {n_dropped} articles dropped")
+    return clusters, drop
 
-            seen_hashes.add(h)
-            article_id = obj.get("id") or abs(hash(obj["url"]))
-            out_path = os.path.join(out_dir, f"{article_id}.txt")
+def process_raw_article(obj, name, st, out_dir, seen_hashes, near_dups):
+    # remplit l'état `st` de l'article brut `name` ; renvoie le texte écrit
+    # dans le store raw_text, ou None si l'article est écarté
+    text = normalize(obj.get("content", ""))
+    n_words = len(text.split())
+    
+    if n_words < MIN_WORDS:  # Minimum word count
+        print(f"[WARNING] Skipping short article: {name}")
+        st["status"] = "short"
+        return None
 
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write(text)
+    h = hash_text(text)
+    st["sha1"] = h
+    if name in near_dups:
+        st["status"] = "near_duplicate"
+        return None
+    if h in seen_hashes:
+        st["status"] = "duplicate"
+        return None
 
-            saved += 1
-            stats["word_counts"].append(len(text.split()))
-            
+    seen_hashes.add(h)
+    doc_id = obj.get("id") or stable_article_id(obj["url"])
+    open_store(out_dir).put(doc_id, {"id": doc_id, "text": text})
+
+    st["status"] = "saved"
+    st["id"] = doc_id
+    st["words"] = n_words
+    return text
+
+def process_category(cat, incremental=True, near_dups=None, near_dup_clusters=None):
+    raw_dir = os.path.join(RAW_BASE, cat)
+    out_dir = os.path.join(OUT_BASE, cat)
+    os.makedirs(out_dir, exist_ok=True)
+
+    previous = load_previous_stats(out_dir) if incremental else None
+    files_state = previous.get("files", {}) if previous else {}
+
+    raw_store = open_store(raw_dir)
+    out_store = open_store(out_dir)
+    remove_legacy_texts(out_dir)
+    present = set(raw_store.ids())
+    if not incremental:
+        for doc_id in out_store.ids():
+            out_store.delete(doc_id)
+        out_store.compact()
+    # sha1 des articles gardés qui disparaissent ou sont retraités : leurs
+    # doublons exacts doivent être réexaminés
+    released = set()
+    # articles bruts supprimés depuis la dernière construction
+    for name in list(files_state):
+        if name not in present:
+            st = files_state.pop(name)
+            if st["status"] == "saved":
+                released.add(st["sha1"])
+            remove_output(out_dir, st)
+
+    near_dups = near_dups or set()
+    seen_hashes = {st["sha1"] for st in files_state.values() if st["status"] == "saved"}
+    todo = []
+    for name in sorted(present):
+        st = files_state.get(name)
+        # seuls les articles nouveaux ou réécrits par le scraping sont retraités
+        near_dup_changed = st is not None and (st["status"] == "near_duplicate") != (name in near_dups)
+        if st is None or st.get("version") != raw_store.doc_version(name) or near_dup_changed:
+            if st and st["status"] == "saved":
+                seen_hashes.discard(st["sha1"])
+                released.add(st["sha1"])
+                remove_output(out_dir, st)
+            todo.append(name)
+    # doublons d'un article retraité ou supprimé, examinés après les articles
+    # modifiés (l'article gardé jusqu'ici reste prioritaire à contenu égal)
+    queued = set(todo)
+    recheck = [name for name in sorted(present)
+               if name not in queued and files_state[name]["status"] == "duplicate"
+               and files_state[name]["sha1"] in released]
+    todo.extend(recheck)
+
+    print(f"[INFO] {cat}: {len(todo) - len(recheck)} new/changed raw articles, {len(recheck)} duplicates to re-check, "
+          f"{len(present) - len(todo)} up to date")
+
+    for name in todo:
+        st = {"version": raw_store.doc_version(name), "sha1": None, "words": 0}
+        files_state[name] = st
+        try:
+            process_raw_article(raw_store.get(name), name, st, out_dir, seen_hashes, near_dups)
         except Exception as e:
-            print(f"[ERROR] Failed processing {fpath}: {e}")
-            errors += 1
+            print(f"[ERROR] Failed processing {cat}/{name}: {e}")
+            st["status"] = "error"
+    out_store.flush()
+    if out_store.dead_bytes() > out_store.shard_max_bytes:
+        out_store.compact()
 
-    stats["saved"] = saved
-    stats["duplicates"] = duplicates
-    stats["errors"] = errors
-    stats["avg_words"] = sum(stats["word_counts"]) / len(stats["word_counts"]) if stats["word_counts"] else 0
-    
-    print(f"[INFO] {cat}: Saved={saved}, Duplicates={duplicates}, Errors={errors}, Avg Words={stats['avg_words']:.0f}")
+    stats = summarize(files_state)
+    print(f"[INFO] {cat}: Saved={stats['saved']}, Duplicates={stats['duplicates']}, Near-duplicates={stats['near_duplicates']}, Errors={stats['errors']}, Avg Words={stats['avg_words']:.0f}")
+    if near_dup_clusters is not None:
+        stats["near_duplicate_clusters"] = [
+            c for c in near_dup_clusters
+            if any(k.startswith(f"{cat}/") for k in c["members"])
+        ]
     
-    # Save statistics
+    # Save statistics (l'état par fichier sert à la prochaine construction incrémentale)
+    stats["files"] = files_state
     with open(os.path.join(out_dir, "_stats.json"), "w") as f:
         json.dump(stats, f, indent=2)
     
     return stats
 
-def main():
-    result_g = main_gaza()
-    result_u = main_ukrain()
-    process_category("gaza")
-    process_category("ukraine")
+def rebuild_offline(workers=None):
+    # ré-extraction depuis l'archive HTML (aucun accès réseau) puis
+    # reconstruction complète de data/raw_text
+    manifest = FetchManifest()
+    cache = HttpCache()
+    results = {}
+    for cat in ("gaza", "ukraine"):
+        migrate_legacy_ids(cat, manifest)
+        results[cat] = reextract_category(cat, os.path.join(RAW_BASE, cat), manifest, workers=workers, cache=cache)
+    manifest.save()
+    cache.save()
+    compact_archive(open_store(HTML_ARCHIVE_DIR))
+    clusters, drop = detect_near_duplicates()
+    for cat in ("gaza", "ukraine"):
+        process_category(cat, incremental=False, near_dups=drop[cat], near_dup_clusters=clusters)
+    return results
+
+def main(full=False, stream=False, offline=False, workers=None):
+    # full=True : revalide tous les liens et reconstruit data/raw_text depuis zéro
+    if offline:
+        overall_stats = {"offline": rebuild_offline(workers)}
+        with open(os.path.join(OUT_BASE, "_overall_stats.json"), "w") as f:
+            json.dump(overall_stats, f, indent=2)
+        print("[DONE] Corpus rebuilt from the HTML archive!")
+        # seul data/raw_text est reconstruit : data/processed_clean et le
+        # corpus compilé datent du dernier clean_corpus
+        print("[WARNING] data/processed_clean and the token corpus were not updated; "
+              "run src/preprocessing/clean_corpus.py to refresh them")
+        return
+
+    if stream:
+        # téléchargement, extraction et prétraitement en parallèle (écrit aussi
+        # data/processed_clean : clean_corpus n'est plus nécessaire)
+        from stream_pipeline import run_stream
+        overall_stats = run_stream(refresh=full)
+        with open(os.path.join(OUT_BASE, "_overall_stats.json"), "w") as f:
+            json.dump(overall_stats, f, indent=2)
+        print("[DONE] Corpus built and preprocessed (streaming)!")
+        return
+
+    manifest = FetchManifest()
+    migrate_legacy_ids("gaza", manifest)
+    migrate_legacy_ids("ukraine", manifest)
+    manifest.save()
+
+    # même article listé pour les deux conflits : signalé, pas retiré
+    cross = find_cross_category({"gaza": GAZA_LINKS, "ukraine": UKRAINE_LINKS})
+    result_g = main_gaza(refresh=full)
+    result_u = main_ukrain(refresh=full)
+    clusters, drop = detect_near_duplicates(incremental=not full)
+    process_category("gaza", incremental=not full, near_dups=drop["gaza"], near_dup_clusters=clusters)
+    process_category("ukraine", incremental=not full, near_dups=drop["ukraine"], near_dup_clusters=clusters)
     #save overall stats
     overall_stats = {
         "gaza": result_g,
-        "ukraine": result_u 
+        "ukraine": result_u,
+        "cross_category_links": cross
     }
     with open(os.path.join(OUT_BASE, "_overall_stats.json"), "w") as f:
         json.dump(overall_stats, f, indent=2)
@@ -95,4 +327,12 @@ def main():
     print("[DONE] Corpus built!")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Scrape links and build data/raw_text")
+    parser.add_argument("--full", action="store_true", help="Revalidate every link and rebuild from scratch")
+    parser.add_argument("--stream", action="store_true", help="Fetch, extract and preprocess concurrently")
+    parser.add_argument("--offline", action="store_true",
+                        help="Re-extract every article from the HTML archive, without network access")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for --offline (default: all cores)")
+    args = parser.parse_args()
+    main(full=args.full, stream=args.stream, offline=args.offline, workers=args.workers)
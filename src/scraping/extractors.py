@@ -0,0 +1,152 @@
+from abc import ABC, abstractmethod
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+# balises dont le texte n'est pas du contenu (BeautifulSoup les exclut de get_text)
+SKIPPED_TAGS = {"script", "style", "template"}
+
+
+class BaseExtractor(ABC):
+    """Extrait (titre, paragraphes) d'une page HTML.
+
+    Les paragraphes sont renvoyés bruts (non strippés, vides compris) dans
+    l'ordre du document : extract_article applique ensuite le même filtrage
+    quel que soit le backend.
+    """
+    name = "base"
+
+    @abstractmethod
+    def extract(self, html):
+        """(titre, [paragraphes]) de `html`."""
+
+
+class Bs4Extractor(BaseExtractor):
+    # backend de référence (html.parser, pur Python)
+    name = "bs4"
+
+    def extract(self, html):
+        soup = BeautifulSoup(html, "html.parser")
+        title = soup.title.get_text() if soup.title else ""
+        return title, [p.get_text() for p in soup.find_all("p")]
+
+
+class _ArticleTarget:
+    # cible SAX pour le parseur lxml : aucun arbre n'est construit, seul le
+    # texte de <title> et des <p> est accumulé
+    def __init__(self):
+        self.title = None
+        self._title_buf = None
+        self._open_p = []
+        self._skip = 0
+        self.paragraphs = []
+
+    def start(self, tag, attrib):
+        if tag == "p":
+            # on réserve la place du paragraphe : ordre des balises ouvrantes
+            self.paragraphs.append(None)
+            self._open_p.append((len(self.paragraphs) - 1, []))
+        elif tag == "title" and self.title is None and self._title_buf is None:
+            self._title_buf = []
+        elif tag in SKIPPED_TAGS:
+            self._skip += 1
+
+    def data(self, text):
+        if self._skip:
+            return
+        for _, buf in self._open_p:
+            buf.append(text)
+        if self._title_buf is not None:
+            self._title_buf.append(text)
+
+    def end(self, tag):
+        if tag == "p" and self._open_p:
+            idx, buf = self._open_p.pop()
+            self.paragraphs[idx] = "".join(buf)
+        elif tag == "title" and self._title_buf is not None:
+            self.title = "".join(self._title_buf)
+            self._title_buf = None
+        elif tag in SKIPPED_TAGS and self._skip:
+            self._skip -= 1
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        while self._open_p:
+            idx, buf = self._open_p.pop()
+            self.paragraphs[idx] = "".join(buf)
+        if self.title is None and self._title_buf is not None:
+            self.title = "".join(self._title_buf)
+        return self.title or "", self.paragraphs
+
+
+class LxmlExtractor(BaseExtractor):
+    # parseur C libxml2 en mode streaming (feed), sans construction d'arbre
+    name = "lxml"
+
+    def extract(self, html):
+        parser = etree.HTMLParser(target=_ArticleTarget(), recover=True)
+        parser.feed(html)
+        return parser.close()
+
+
+class SelectolaxExtractor(BaseExtractor):
+    # parseur C à sélecteurs CSS (optionnel : pip install selectolax)
+    name = "selectolax"
+
+    def extract(self, html):
+        tree = SelectolaxParser(html)
+        for node in tree.css("script, style, template"):
+            node.decompose()
+        title_node = tree.css_first("title")
+        title = title_node.text() if title_node else ""
+        return title, [p.text() for p in tree.css("p")]
+
+
+EXTRACTORS = {"bs4": Bs4Extractor}
+if HAS_LXML:
+    EXTRACTORS["lxml"] = LxmlExtractor
+if HAS_SELECTOLAX:
+    EXTRACTORS["selectolax"] = SelectolaxExtractor
+
+# bs4 reste la référence : lxml et selectolax sont plus rapides mais ne
+# recollent pas le texte des <p> imbriqués ou mal fermés comme BeautifulSoup
+# (<p>a<p>b, <p>x<div>y</div>z</p>...), ils ne sont utilisés que sur demande
+DEFAULT_BACKEND = "bs4"
+
+_instances = {}
+
+
+def get_extractor(name=None):
+    name = name or DEFAULT_BACKEND
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extraction backend '{name}'. Available: {sorted(EXTRACTORS)}")
+    if name not in _instances:
+        _instances[name] = EXTRACTORS[name]()
+    return _instances[name]
+
+
+def extract_title_paragraphs(html, backend=None):
+    extractor = get_extractor(backend)
+    try:
+        title, paragraphs = extractor.extract(html)
+    except Exception as e:
+        if extractor.name == "bs4":
+            raise
+        print(f"[WARNING] {extractor.name} extraction failed ({e}), falling back to bs4")
+        title, paragraphs = get_extractor("bs4").extract(html)
+    title = title.strip()
+    paragraphs = [p.strip() for p in paragraphs]
+    return title, [p for p in paragraphs if len(p) > 0]
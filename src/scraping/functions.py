@@ -1,32 +1,250 @@
 import os
+import re
+import sys
 import json
+import time
+import codecs
+import hashlib
+import threading
+from contextlib import contextmanager
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
 from datetime import datetime
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+from extractors import extract_title_paragraphs
+from corpus_store import open_store
+from resilience import failure_reason
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; ProjectNLPBot/1.0)"
 }
 
-def read_links(path):
+# verrou (fichier .lock) partagé par le scraping et le serveur pour les
+# fichiers de liens ; au-delà de cet âge un verrou est considéré orphelin
+STALE_LOCK_SECONDS = 30
+
+# Pool de connexions keep-alive : une session par domaine
+POOL_CONNECTIONS = 2   # hôtes distincts gardés par session (redirections, sous-domaines)
+POOL_MAXSIZE = 4       # connexions simultanées réutilisables par hôte
+# encodages que urllib3 sait décompresser (gzip, deflate + br/zstd si installés)
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+# backend d'extraction HTML (voir extractors.py) ; None = bs4. lxml ou
+# selectolax sont plus rapides mais peuvent changer le texte des pages mal formées
+EXTRACTION_BACKEND = os.environ.get("EXTRACTION_BACKEND") or None
+MIN_ARTICLE_WORDS = 150
+
+# échecs définitifs : le lien peut être retiré sans nouvel essai
+PERMANENT_REASONS = {"http_404", "http_410", "too_short"}
+# téléchargements abandonnés (voir read_html) : comptés comme ignorés
+# (statistics["aborted"]), jamais comme échecs, le lien reste dans le fichier
+# et n'est pas retéléchargé tant qu'il ne change pas (manifest)
+SKIP_REASONS = {"not_html", "too_large"}
+REQUEST_TIMEOUT = 12
+
+# téléchargement en flux : on abandonne dès que la page ne peut pas être un
+# article (PDF, vidéo, live blog géant) au lieu de tout lire puis de la rejeter
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+MAX_PAGE_BYTES = 3 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# en-têtes gardés dans l'archive HTML (voir html_archive.py)
+ARCHIVED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+
+# paramètres de suivi (partages, newsletters, pubs) : n'identifient pas l'article
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ocid", "cmpid", "cmp",
+    "icid", "ito", "ref", "ref_src", "ref_url", "smid", "smtyp", "sh", "taid", "intcmp", "_ga",
+    "amp", "outputtype",
+}
+TRACKING_PREFIXES = ("utm_", "at_", "__twitter")
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+AMP_CACHE_SUFFIX = ".cdn.ampproject.org"
+
+def read_raw_links(path):
     with open(path, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
+
+def read_links(path):
+    # liens à télécharger : première variante de chaque article (même
+    # normalize_url), telle qu'écrite dans le fichier
+    return dedupe_links(read_raw_links(path))[0]
     
 def get_domain(url):
     return urlparse(url).netloc.replace("www.", "")
 
 
-def remove_link_from_file(link, filename):
+def canonical_url(url):
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+
+def normalize_url(url):
+    """Clé de déduplication d'un lien d'article.
+
+    Regroupe les variantes d'une même page : paramètres de suivi, versions
+    AMP (cache ampproject, sous-domaine amp., segment /amp), www. ou non,
+    port par défaut, fragment, "/" final et "?" vide. Sert seulement à
+    comparer des liens : ce n'est pas forcément une adresse valide, on
+    télécharge toujours le lien d'origine.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    path = parts.path
+
+    if host.endswith(AMP_CACHE_SUFFIX):
+        # https://www-site-com.cdn.ampproject.org/c/s/www.site.com/article
+        segments = path.split("/", 4)
+        if len(segments) >= 4 and segments[1] in ("c", "v"):
+            if segments[2] == "s":
+                scheme, segments = "https", segments[:2] + segments[3:]
+            host = segments[2].lower()
+            path = "/" + (segments[3] if len(segments) > 3 else "")
+    for prefix in ("www.", "amp."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    netloc = host
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+
+    path = "/".join(seg for seg in path.split("/") if seg.lower() != "amp")
+    path = re.sub(r"\.amp(?=\.html?$)|\.amp$", "", path)
+    path = path.rstrip("/") or "/"
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query.lstrip("?"), keep_blank_values=True)
+        if k and k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ""))
+
+
+def dedupe_links(links):
+    # renvoie (liens uniques d'origine, {variante écartée: lien gardé})
+    unique, kept, dropped = [], {}, {}
+    for link in links:
+        key = normalize_url(link)
+        if key in kept:
+            if link != kept[key]:
+                dropped[link] = kept[key]
+            continue
+        kept[key] = link
+        unique.append(link)
+    return unique, dropped
+
+
+def report_duplicate_links(filename):
+    # variantes d'un même article dans le fichier : seule la première est
+    # téléchargée, le fichier n'est pas modifié
+    _, dropped = dedupe_links(read_raw_links(filename))
+    if dropped:
+        print(f"[INFO] {filename}: {len(dropped)} duplicate link variants skipped")
+    return dropped
+
+
+def find_cross_category(links_files):
+    # même article (même normalize_url) présent dans plusieurs fichiers de liens
+    seen = {}
+    for cat, filename in links_files.items():
+        for link in read_links(filename):
+            seen.setdefault(normalize_url(link), []).append(cat)
+    cross = {link: cats for link, cats in seen.items() if len(cats) > 1}
+    for link, cats in cross.items():
+        print(f"[WARNING] Link listed in several categories ({', '.join(cats)}): {link}")
+    return cross
+
+
+def article_id(url):
+    # identifiant stable d'un processus à l'autre (hash() est salé par processus)
+    return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+def configure_sessions(pool_connections=None, pool_maxsize=None):
+    global POOL_CONNECTIONS, POOL_MAXSIZE
+    changed = False
+    if pool_connections is not None and pool_connections != POOL_CONNECTIONS:
+        POOL_CONNECTIONS = pool_connections
+        changed = True
+    if pool_maxsize is not None and pool_maxsize != POOL_MAXSIZE:
+        POOL_MAXSIZE = pool_maxsize
+        changed = True
+    # les sessions existantes ont été créées avec l'ancienne taille de pool
+    if changed:
+        close_sessions()
+
+
+def get_session(url):
+    domain = get_domain(url)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(domain)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSIONS[domain] = session
+    return session
+
+
+def close_sessions():
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
+
+
+@contextmanager
+def locked_links_file(filename, timeout=STALE_LOCK_SECONDS):
+    lock_path = filename + ".lock"
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > timeout:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.05)
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
 
-        # keep only the lines that are not the link
-        new_lines = [l for l in lines if l.strip() != link]
+def write_links_atomic(filename, links):
+    # écriture dans un fichier temporaire puis rename : un lecteur ne voit
+    # jamais un fichier de liens à moitié écrit
+    tmp_path = filename + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for link in links:
+            f.write(link + "\n")
+    os.replace(tmp_path, filename)
 
-        with open(filename, "w", encoding="utf-8") as f:
-            f.writelines(new_lines)
+
+def remove_link_from_file(link, filename):
+    try:
+        with locked_links_file(filename):
+            links = read_raw_links(filename)
+            # keep only the lines that are not the link (ni ses variantes,
+            # qui ne sont jamais téléchargées à sa place)
+            key = normalize_url(link)
+            write_links_atomic(filename, [l for l in links if l != link and normalize_url(l) != key])
 
         print(f"[INFO] Removed bad link from {filename} : {link}")
 
@@ -34,48 +252,178 @@ def remove_link_from_file(link, filename):
         print(f"[ERROR] Failed to remove link: {e}")
 
 
-def extract_article(url, LINKS_FILE):
+def report_failure(url, links_file, reason, ledger=None):
+    # avec un journal, le retrait du lien est différé à la fin du run
+    if ledger is not None:
+        ledger.record_failure(url, links_file, reason)
+    elif reason in PERMANENT_REASONS:
+        # sans journal, un échec transitoire (timeout, 503...) ne retire pas le lien
+        remove_link_from_file(url, links_file)
+
+
+def parse_article(url, html, backend=None):
+    title, paragraphs = extract_title_paragraphs(html, backend or EXTRACTION_BACKEND)
+    content = "\n".join(paragraphs)
+
+    if len(content.split()) < MIN_ARTICLE_WORDS:
+        return None
+    return {
+        "id": article_id(url),
+        "url": url,
+        "media": get_domain(url),
+        "title": title,
+        "content": content,
+        "fetched_at": datetime.utcnow().isoformat() + "Z"
+    }
+
+
+def http_get(url, headers=None, health=None):
+    # corps non lu (stream=True) : voir read_html
+    # avec `health` (resilience.DomainHealth) : retries et disjoncteur par domaine
+    if health is not None:
+        return health.get(get_session(url), get_domain(url), url, headers=headers,
+                          timeout=REQUEST_TIMEOUT, stream=True)
+    return get_session(url).get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True)
+
+
+class PageRejected(Exception):
+    def __init__(self, reason, detail):
+        super().__init__(detail)
+        self.reason = reason
+
+
+class SkippedPage:
+    # renvoyé par fetch_page / extract_article à la place de None pour une
+    # page abandonnée (SKIP_REASONS) : faux comme None, mais garde la raison
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __bool__(self):
+        return False
+
+
+def detect_encoding(response, first_chunk):
+    # charset déclaré par l'en-tête, sinon par <meta> ; à défaut détection
+    # statistique, sur le premier bloc seulement (r.text analyse tout le corps)
+    candidates = []
+    if "charset" in response.headers.get("Content-Type", "").lower():
+        candidates.append(response.encoding)
+    m = META_CHARSET_RE.search(first_chunk)
+    if m:
+        candidates.append(m.group(1).decode("ascii"))
+    candidates.append(requests.compat.chardet.detect(first_chunk)["encoding"] if first_chunk else None)
+    for encoding in candidates:
+        try:
+            if encoding:
+                return codecs.lookup(encoding).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+def read_html(response, max_bytes=None):
+    max_bytes = max_bytes or MAX_PAGE_BYTES
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    # pas de Content-Type : on laisse une chance à la page
+    if content_type and content_type not in HTML_CONTENT_TYPES:
+        response.close()
+        raise PageRejected("not_html", f"content type {content_type}")
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        response.close()
+        raise PageRejected("too_large", f"{length} bytes announced")
+
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            response.close()
+            raise PageRejected("too_large", f"more than {max_bytes} bytes")
+    body = b"".join(chunks)
+    return body.decode(detect_encoding(response, chunks[0] if chunks else b""), errors="replace")
+
+
+def archive_page(archive, url, response, html):
+    archive.put(article_id(url), {
+        "url": url,
+        "final_url": response.url,
+        "status": response.status_code,
+        "headers": {h: response.headers[h] for h in ARCHIVED_HEADERS if h in response.headers},
+        "fetched_at": datetime.utcnow().isoformat() + "Z",
+        "html": html,
+    })
+
+
+def fetch_page(url, LINKS_FILE, cache=None, ledger=None, health=None, archive=None):
+    # renvoie (réponse, html, None) si la page a été téléchargée,
+    # (None, None, article) si le cache a répondu 304, SkippedPage si elle a
+    # été abandonnée (non HTML, trop grosse) ou None en cas d'échec.
+    # Avec `archive` (store), le HTML téléchargé y est gardé tel quel
+    headers = cache.conditional_headers(url) if cache else {}
     try:
-        r = requests.get(url, headers=HEADERS, timeout=12)
+        r = http_get(url, headers, health)
         r.raise_for_status()
+        if r.status_code == 304:
+            r.close()
+            article = cache.get(url)
+            if article:
+                if ledger is not None:
+                    ledger.record_success(url, LINKS_FILE)
+                return None, None, article
+            # entrée de cache perdue entre-temps : on retélécharge sans condition
+            r = http_get(url, health=health)
+            r.raise_for_status()
+        html = read_html(r)
+    except PageRejected as e:
+        print(f"[WARNING] Skipping {url}: {e}")
+        if health is not None:
+            health.record_abort(get_domain(url), e.reason)
+        return SkippedPage(e.reason)
     except requests.exceptions.RequestException as e:
+        if getattr(e, "response", None) is not None:
+            e.response.close()
         print(f"[ERROR] Cannot fetch {url}: {e}")
-        remove_link_from_file(url, LINKS_FILE)
+        report_failure(url, LINKS_FILE, failure_reason(e), ledger)
         return None
     except Exception as e:
         print(f"[UNEXPECTED ERROR] {url}: {e}")
         return None 
 
-    soup = BeautifulSoup(r.text, "html.parser")
-
-    # Title
-    title = ""
-    if soup.title:
-        title = soup.title.get_text().strip()
+    if cache:
+        cache.record_miss()
+    if archive is not None:
+        archive_page(archive, url, r, html)
+    return r, html, None
 
-    # Extract paragraphs
-    paragraphs = [p.get_text().strip() for p in soup.find_all("p")]
-    paragraphs = [p for p in paragraphs if len(p) > 0]
 
-    content = "\n".join(paragraphs)
-
-    if len(content.split()) < 150:
+def finish_article(url, LINKS_FILE, response, article, cache=None, ledger=None):
+    if article is None:
         print(f"[WARNING] Content too short for {url}")
-        remove_link_from_file(url, LINKS_FILE)
+        report_failure(url, LINKS_FILE, "too_short", ledger)
         return None
-    return {    
-        "url": url,
-        "media": get_domain(url),
-        "title": title,
-        "content": content,
-        "fetched_at": datetime.utcnow().isoformat() + "Z"
-    }
+    if cache:
+        cache.put(url, response.headers, article)
+    if ledger is not None:
+        ledger.record_success(url, LINKS_FILE)
+    return article
+
 
+def extract_article(url, LINKS_FILE, cache=None, ledger=None, health=None, archive=None):
+    page = fetch_page(url, LINKS_FILE, cache, ledger, health, archive)
+    if not page:
+        return page  # None ou SkippedPage
+    r, html, cached = page
+    if cached is not None:
+        return cached
+    article = parse_article(url, html)
+    return finish_article(url, LINKS_FILE, r, article, cache, ledger)
 
-def save_json(article, OUTPUT_DIR):
-    article_id = abs(hash(article["url"]))
-    path = os.path.join(OUTPUT_DIR, f"{article_id}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(article, f, indent=2, ensure_ascii=False)
-    print(f"[OK] Saved {path}")
 
+def save_article(article, OUTPUT_DIR):
+    # OUTPUT_DIR est un store (shards compressés), plus un dossier de JSON
+    aid = article.get("id") or article_id(article["url"])
+    open_store(OUTPUT_DIR).put(aid, article)
+    print(f"[OK] Saved {aid} to {OUTPUT_DIR}")
+    return aid
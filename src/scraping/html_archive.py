@@ -0,0 +1,74 @@
+# Archive du HTML brut téléchargé (façon WARC) : un store compressé,
+# append-only, indexé par l'id stable de l'URL (écrit par
+# functions.archive_page pendant le scraping). Permet de relancer
+# l'extraction sur tout le corpus sans retélécharger une seule page.
+#
+#   python src/scraping/build_corpus.py --offline
+from concurrent.futures import ProcessPoolExecutor
+
+from functions import parse_article, article_id, open_store
+from manifest import content_sha1
+
+HTML_ARCHIVE_DIR = "./data/html_archive"
+BATCH_SIZE = 512
+
+
+def compact_archive(archive):
+    # chaque téléchargement complet (--full, serveur sans ETag/Last-Modified)
+    # ajoute une nouvelle copie de la page : les anciennes sont récupérées
+    # dès qu'elles pèsent plus d'un shard
+    archive.flush()
+    if archive.dead_bytes() > archive.shard_max_bytes:
+        print(f"[INFO] Compacting HTML archive ({archive.dead_bytes() / 2**20:.1f} MB of old copies)")
+        archive.compact()
+
+
+def _parse(job):
+    url, html = job
+    return parse_article(url, html)
+
+
+def reextract_category(cat, raw_dir, manifest, archive_dir=HTML_ARCHIVE_DIR, workers=None, cache=None):
+    """Ré-extrait tous les articles archivés de `cat` avec l'extraction actuelle.
+
+    Les articles déjà présents dans le store brut sont réécrits ; les pages
+    archivées qui avaient été rejetées (trop courtes) sont retentées ; celles
+    qui ne passent plus le seuil de mots sont retirées du store brut. Avec
+    `cache` (HttpCache), l'article gardé pour les réponses 304 est remplacé
+    aussi : sinon le run suivant réécrirait l'ancienne extraction.
+    """
+    archive = open_store(archive_dir)
+    raw_store = open_store(raw_dir)
+    ids = set(raw_store.ids())
+    missing = sum(1 for i in ids if i not in archive)
+    for url, entry in manifest.entries.items():
+        if entry.get("category") == cat:
+            ids.add(entry.get("id") or article_id(url))
+    ids = sorted(i for i in ids if i in archive)
+
+    stats = {"archived": len(ids), "extracted": 0, "dropped": 0, "missing": missing}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # par lots : pool.map soumet tout d'un coup, on ne garde en mémoire
+        # que le HTML d'un lot
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start:start + BATCH_SIZE]
+            records = [archive.get(doc_id) for doc_id in batch]
+            articles = pool.map(_parse, [(r["url"], r["html"]) for r in records], chunksize=16)
+            for doc_id, record, article in zip(batch, records, articles):
+                if cache is not None:
+                    cache.replace(record["url"], article)
+                if article is None:
+                    if raw_store.delete(doc_id):
+                        stats["dropped"] += 1
+                    continue
+                # date de téléchargement d'origine, pas celle de la ré-extraction
+                article["fetched_at"] = record["fetched_at"]
+                raw_store.put(doc_id, article)
+                manifest.record_success(article["url"], cat, doc_id, content_sha1(article["content"]),
+                                        article["fetched_at"])
+                stats["extracted"] += 1
+    raw_store.flush()
+    if missing:
+        print(f"[WARNING] {cat}: {missing} raw articles have no archived HTML and were kept as is")
+    print(f"[INFO] {cat}: re-extracted {stats['extracted']} archived pages, dropped {stats['dropped']}")
+    return stats
@@ -0,0 +1,152 @@
+import os
+import json
+import gzip
+import time
+import hashlib
+import threading
+
+CACHE_DIR = "./data/cache/http"
+MAX_CACHE_BYTES = 200 * 1024 * 1024  # 200 Mo
+
+
+class HttpCache:
+    """Cache disque des articles extraits, revalidé par GET conditionnel.
+
+    Pour chaque URL on garde l'ETag / Last-Modified de la dernière réponse et
+    l'article déjà extrait : si le serveur répond 304, l'article est relu depuis
+    le cache sans retélécharger ni reparser la page. La taille totale est bornée,
+    les entrées les moins récemment utilisées sont évincées en premier.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+        self.total_bytes = sum(e["size"] for e in self.index.values())
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[WARNING] Corrupted HTTP cache index, starting empty: {e}")
+            return {}
+
+    def _body_path(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def conditional_headers(self, url):
+        with self._lock:
+            entry = self.index.get(url)
+        if not entry or not os.path.exists(self._body_path(url)):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get(self, url):
+        # appelé sur une réponse 304 : l'article en cache est toujours valide
+        try:
+            with gzip.open(self._body_path(url), "rt", encoding="utf-8") as f:
+                article = json.load(f)
+        except Exception:
+            return None
+        with self._lock:
+            if url in self.index:
+                self.index[url]["last_access"] = time.time()
+            self.hits += 1
+        return article
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, url, response_headers, article):
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        # sans validateur, impossible de faire un GET conditionnel plus tard
+        if not etag and not last_modified:
+            return
+
+        path = self._body_path(url)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(article, f, ensure_ascii=False)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            old = self.index.get(url)
+            if old:
+                self.total_bytes -= old["size"]
+            self.index[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": size,
+                "last_access": time.time()
+            }
+            self.total_bytes += size
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def replace(self, url, article):
+        # nouvelle extraction de la même page (build_corpus --offline) : les
+        # validateurs restent valides, seul l'article change. Sans article,
+        # l'entrée est retirée (un 304 ne doit plus rien renvoyer)
+        with self._lock:
+            entry = self.index.get(url)
+            if entry is None:
+                return
+            path = self._body_path(url)
+            self.total_bytes -= entry["size"]
+            if article is None:
+                del self.index[url]
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                return
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                json.dump(article, f, ensure_ascii=False)
+            entry["size"] = os.path.getsize(path)
+            self.total_bytes += entry["size"]
+
+    def _evict(self):
+        # LRU : on descend à 90% du budget pour ne pas évincer à chaque ajout
+        target = int(self.max_bytes * 0.9)
+        for url, entry in sorted(self.index.items(), key=lambda kv: kv[1]["last_access"]):
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(self._body_path(url))
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= entry["size"]
+            del self.index[url]
+            self.evictions += 1
+
+    def save(self):
+        with self._lock:
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_path)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.index),
+            "size_bytes": self.total_bytes
+        }
@@ -0,0 +1,146 @@
+import os
+import json
+import threading
+from datetime import datetime
+
+from functions import (
+    locked_links_file, write_links_atomic, read_raw_links, normalize_url, PERMANENT_REASONS, SKIP_REASONS
+)
+
+LEDGER_PATH = "./data/dead_links.jsonl"
+# nombre d'échecs transitoires (timeout, 5xx...) avant de retirer un lien
+MAX_RETRIES = 3
+# les échecs définitifs (PERMANENT_REASONS) sont retirés dès la fin du run
+# journal réécrit (une ligne par lien) au-delà de cette taille, et quand il a
+# doublé depuis la dernière réécriture
+COMPACT_BYTES = 1024 * 1024
+
+
+def _now():
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class LinkLedger:
+    """Journal append-only des liens en échec.
+
+    Les échecs sont ajoutés au journal pendant le scraping ; les fichiers de
+    liens ne sont réécrits qu'une fois par run (apply), de manière atomique.
+    Un lien en échec transitoire n'est retiré qu'après MAX_RETRIES runs : une
+    instance correspond à un run, et un lien ne compte qu'un échec par run.
+    """
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = {}
+        self.run = _now()
+        self._compacted_bytes = 0
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._replay(json.loads(line))
+                    except ValueError:
+                        continue  # ligne tronquée (run interrompu)
+
+    def _replay(self, entry):
+        url = entry["url"]
+        if entry["reason"] in SKIP_REASONS:
+            return  # anciens journaux : une page ignorée n'est pas un lien mort
+        if entry["reason"] == "ok":
+            self.state.pop(url, None)
+            return
+        st = self.state.setdefault(url, {"file": entry["file"], "failures": 0, "run": None})
+        st["file"] = entry["file"]
+        if "failures" in entry:
+            st["failures"] = entry["failures"]  # ligne d'un journal compacté
+        elif entry.get("run") is None or entry["run"] != st["run"]:
+            st["failures"] += 1
+        st["run"] = entry.get("run")
+        st["last_reason"] = entry["reason"]
+        st["last_failure"] = entry.get("ts")
+        st["permanent"] = (st.get("permanent", False) or entry.get("permanent", False)
+                           or entry["reason"] in PERMANENT_REASONS)
+
+    def _append(self, entry):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._replay(entry)
+
+    def record_failure(self, url, links_file, reason):
+        # un échec par lien et par run ; un échec définitif est toujours noté
+        st = self.state.get(url)
+        if st is not None and st["run"] == self.run and (st["permanent"] or reason not in PERMANENT_REASONS):
+            return
+        self._append({
+            "url": url,
+            "file": links_file,
+            "reason": reason,
+            "run": self.run,
+            "ts": _now()
+        })
+
+    def record_success(self, url, links_file):
+        # remet le compteur à zéro si le lien avait déjà échoué
+        if url in self.state:
+            self._append({
+                "url": url,
+                "file": links_file,
+                "reason": "ok",
+                "ts": _now()
+            })
+
+    def retry_count(self, url):
+        st = self.state.get(url)
+        return st["failures"] if st else 0
+
+    def to_remove(self, links_file):
+        return {
+            url for url, st in self.state.items()
+            if st["file"] == links_file and (st["permanent"] or st["failures"] >= MAX_RETRIES)
+        }
+
+    def apply(self, links_file):
+        dead = self.to_remove(links_file)
+        if dead:
+            # les variantes d'un lien mort (paramètres de suivi, slash
+            # final...) partent avec lui, comme dans remove_link_from_file
+            dead_keys = {normalize_url(url) for url in dead}
+            with locked_links_file(links_file):
+                links = read_raw_links(links_file)
+                write_links_atomic(links_file, [l for l in links if l not in dead and normalize_url(l) not in dead_keys])
+            for url in dead:
+                print(f"[INFO] Removed dead link from {links_file} ({self.state[url]['last_reason']}) : {url}")
+                del self.state[url]
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if dead or size > max(COMPACT_BYTES, 2 * self._compacted_bytes):
+            self._compact()
+        return len(dead)
+
+    def _compact(self):
+        # réécrit le journal avec une ligne par lien encore en échec
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for url, st in self.state.items():
+                    f.write(json.dumps({
+                        "url": url,
+                        "file": st["file"],
+                        "reason": st["last_reason"],
+                        "failures": st["failures"],
+                        "permanent": st["permanent"],
+                        "run": st["run"],
+                        "ts": st["last_failure"]
+                    }, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+            self._compacted_bytes = os.path.getsize(self.path)
+
+    def stats(self, links_file):
+        pending = [st for st in self.state.values() if st["file"] == links_file]
+        return {
+            "failing_links": len(pending),
+            "reasons": {r: sum(1 for st in pending if st["last_reason"] == r)
+                        for r in {st["last_reason"] for st in pending}}
+        }
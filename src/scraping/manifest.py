@@ -0,0 +1,83 @@
+import os
+import json
+import sys
+import hashlib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+from corpus_store import open_store
+
+MANIFEST_PATH = "./data/raw/_manifest.json"
+
+
+def content_sha1(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class FetchManifest:
+    """Registre des liens déjà récupérés : URL -> id d'article, sha1 du contenu,
+    date de récupération et statut. Permet de ne retélécharger que les liens
+    nouveaux (ou modifiés, via GET conditionnel) lors d'une reconstruction."""
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                print(f"[WARNING] Corrupted manifest {path}, starting empty: {e}")
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def article_id(self, url):
+        entry = self.entries.get(url)
+        return entry["id"] if entry and entry.get("id") else None
+
+    def needs_fetch(self, url, output_dir):
+        entry = self.entries.get(url)
+        if entry and entry.get("status") == "skipped":
+            return False  # page non HTML ou trop grosse : revue seulement avec refresh
+        if not entry or entry.get("status") != "ok":
+            return True
+        # l'article brut a pu être supprimé du store entre-temps
+        return entry["id"] not in open_store(output_dir)
+
+    def is_unchanged(self, url, sha1, output_dir):
+        entry = self.entries.get(url)
+        return (
+            entry is not None
+            and entry.get("sha1") == sha1
+            and entry["id"] in open_store(output_dir)
+        )
+
+    def record_success(self, url, category, article_id, sha1, fetched_at):
+        self.entries[url] = {
+            "id": article_id,
+            "category": category,
+            "sha1": sha1,
+            "fetched_at": fetched_at,
+            "status": "ok"
+        }
+
+    def record_failure(self, url, category):
+        entry = self.entries.get(url, {"id": None, "sha1": None, "fetched_at": None})
+        entry["category"] = category
+        entry["status"] = "failed"
+        self.entries[url] = entry
+
+    def record_skip(self, url, category, reason):
+        entry = self.entries.get(url, {"id": None, "sha1": None, "fetched_at": None})
+        entry["category"] = category
+        entry["status"] = "skipped"
+        entry["reason"] = reason
+        self.entries[url] = entry
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
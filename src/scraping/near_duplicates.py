@@ -0,0 +1,163 @@
+import os
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+NUM_PERM = 128
+SHINGLE_SIZE = 5          # shingles de 5 mots
+JACCARD_THRESHOLD = 0.8
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingle_hashes(text, k=SHINGLE_SIZE):
+    words = text.lower().split()
+    if len(words) < k:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class MinHasher:
+    """Signatures MinHash : NUM_PERM permutations universelles (a*x + b) mod p.
+    La fraction de positions égales entre deux signatures estime la similarité
+    de Jaccard des ensembles de shingles."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+        self.b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+
+    def signature(self, hashes):
+        if len(hashes) == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        # les débordements uint64 sont voulus (même schéma que datasketch)
+        with np.errstate(over="ignore"):
+            phv = (np.outer(self.a, hashes) + self.b[:, None]) % _MERSENNE_PRIME
+        return (phv & _MAX_HASH).min(axis=1)
+
+
+def is_empty_signature(sig):
+    return bool(np.all(np.asarray(sig) == _MAX_HASH))
+
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    # (bandes, lignes) dont le seuil approché (1/b)^(1/r) est le plus proche
+    best = None
+    for r in range(1, num_perm + 1):
+        if num_perm % r:
+            continue
+        b = num_perm // r
+        err = abs((1.0 / b) ** (1.0 / r) - threshold)
+        if best is None or err < best[0]:
+            best = (err, b, r)
+    return best[1], best[2]
+
+
+def find_clusters(keys, signatures, threshold=JACCARD_THRESHOLD, preferred=None):
+    """Regroupe les documents quasi-dupliqués.
+
+    LSH par bandes : seuls les documents partageant au moins une bande
+    identique sont comparés, et chacun seulement au premier document du seau,
+    ce qui garde un coût quasi linéaire. Le représentant d'un groupe est un
+    document de `preferred` s'il y en a un (déjà conservé), sinon la plus
+    petite clé.
+    """
+    n = len(keys)
+    if n < 2:
+        return []
+    sigs = np.asarray(signatures)
+    num_perm = sigs.shape[1]
+    bands, rows = lsh_params(threshold, num_perm)
+
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        buckets = defaultdict(list)
+        chunk = sigs[:, band * rows:(band + 1) * rows]
+        for i in range(n):
+            buckets[chunk[i].tobytes()].append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            first = members[0]
+            for j in members[1:]:
+                if find(first) == find(j):
+                    continue
+                if np.mean(sigs[first] == sigs[j]) >= threshold:
+                    parent[find(j)] = find(first)
+
+    groups = defaultdict(list)
+    for i in range(n):
+        groups[find(i)].append(i)
+
+    preferred = preferred or set()
+    position = {k: i for i, k in enumerate(keys)}
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        member_keys = sorted(keys[i] for i in members)
+        kept = [k for k in member_keys if k in preferred]
+        rep = kept[0] if kept else member_keys[0]
+        rep_sig = sigs[position[rep]]
+        clusters.append({
+            "representative": rep,
+            "members": member_keys,
+            "similarity": {
+                keys[i]: round(float(np.mean(sigs[i] == rep_sig)), 3)
+                for i in members if keys[i] != rep
+            }
+        })
+    clusters.sort(key=lambda c: c["representative"])
+    return clusters
+
+
+class SignatureCache:
+    # signatures déjà calculées, indexées par (clé, version) : la version est
+    # celle de l'article dans le store brut (doc_version, un entier qui change
+    # à chaque réécriture) ; une reconstruction incrémentale ne re-hache que
+    # les articles nouveaux ou modifiés
+    def __init__(self, path, num_perm=NUM_PERM):
+        self.path = path
+        self.num_perm = num_perm
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                data = np.load(path, allow_pickle=False)
+                # ancien cache indexé par mtime : ignoré, tout est recalculé
+                if "versions" in data.files and data["sigs"].shape[1:] == (num_perm,):
+                    for key, version, sig in zip(data["keys"], data["versions"], data["sigs"]):
+                        self.entries[str(key)] = (int(version), sig)
+            except Exception as e:
+                print(f"[WARNING] Cannot read signature cache {path}: {e}")
+
+    def get(self, key, version):
+        entry = self.entries.get(key)
+        if entry and entry[0] == version:
+            return entry[1]
+        return None
+
+    def put(self, key, version, sig):
+        self.entries[key] = (int(version), sig)
+
+    def save(self, keep_keys):
+        keys = [k for k in keep_keys if k in self.entries]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            keys=np.array(keys, dtype=str),
+            versions=np.array([self.entries[k][0] for k in keys], dtype=np.int64),
+            sigs=np.array([self.entries[k][1] for k in keys], dtype=np.uint64).reshape(len(keys), self.num_perm),
+        )
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,174 @@
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# statuts renvoyés par un serveur surchargé ou en panne : on réessaie
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5     # secondes, doublé à chaque tentative
+BACKOFF_MAX = 10.0
+# échecs consécutifs sur un domaine avant d'ouvrir son disjoncteur
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60.0
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Le disjoncteur du domaine est ouvert : la requête n'est pas envoyée."""
+
+
+def failure_reason(exc):
+    if isinstance(exc, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return f"http_{exc.response.status_code}"
+    if isinstance(exc, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        return "connection"
+    return "request_error"
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    # "full jitter" : tirage uniforme dans [0, base * 2^attempt], pour que les
+    # workers bloqués sur le même domaine ne réessaient pas tous ensemble
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after(response, cap=BACKOFF_MAX):
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(cap, max(0.0, delay))
+
+
+class _Domain:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "errors": {},
+            "latency_total": 0.0,
+            "max_latency": 0.0,
+            "circuit_opened": 0,
+            "short_circuited": 0,
+            "aborted": {},
+        }
+
+
+class DomainHealth:
+    """Retries avec backoff exponentiel et disjoncteur par domaine.
+
+    Après BREAKER_THRESHOLD échecs consécutifs (timeout, connexion, 429/5xx),
+    le domaine est coupé pendant `cooldown` secondes : ses requêtes échouent
+    immédiatement (CircuitOpenError) au lieu d'attendre le timeout. À la fin
+    du délai, une seule requête de test est laissée passer ; si elle réussit
+    le domaine est rétabli, sinon il est coupé à nouveau.
+    """
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS, threshold=BREAKER_THRESHOLD,
+                 cooldown=BREAKER_COOLDOWN, sleep=time.sleep):
+        self.max_attempts = max_attempts
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.sleep = sleep
+        self._domains = {}
+        self._lock = threading.Lock()
+
+    def _domain(self, domain):
+        with self._lock:
+            if domain not in self._domains:
+                self._domains[domain] = _Domain()
+            return self._domains[domain]
+
+    def _allow(self, d):
+        with d.lock:
+            if d.opened_at is None:
+                return True
+            if time.monotonic() - d.opened_at < self.cooldown or d.probing:
+                d.stats["short_circuited"] += 1
+                return False
+            d.probing = True
+            return True
+
+    def _success(self, d, latency):
+        with d.lock:
+            d.stats["requests"] += 1
+            d.stats["latency_total"] += latency
+            d.stats["max_latency"] = max(d.stats["max_latency"], latency)
+            d.consecutive_failures = 0
+            d.opened_at = None
+            d.probing = False
+
+    def _failure(self, d, reason, latency):
+        with d.lock:
+            d.stats["requests"] += 1
+            d.stats["latency_total"] += latency
+            d.stats["max_latency"] = max(d.stats["max_latency"], latency)
+            d.stats["errors"][reason] = d.stats["errors"].get(reason, 0) + 1
+            d.consecutive_failures += 1
+            if d.probing or (d.opened_at is None and d.consecutive_failures >= self.threshold):
+                if d.opened_at is None:
+                    d.stats["circuit_opened"] += 1
+                d.opened_at = time.monotonic()
+            d.probing = False
+
+    def record_abort(self, domain, reason):
+        # téléchargement interrompu (type de contenu, taille) : le domaine répond
+        # bien, ce n'est pas un échec pour le disjoncteur
+        d = self._domain(domain)
+        with d.lock:
+            d.stats["aborted"][reason] = d.stats["aborted"].get(reason, 0) + 1
+
+    def get(self, session, domain, url, headers=None, timeout=12, stream=False):
+        d = self._domain(domain)
+        for attempt in range(self.max_attempts):
+            if not self._allow(d):
+                raise CircuitOpenError(f"circuit open for {domain}")
+            t0 = time.monotonic()
+            response = None
+            try:
+                response = session.get(url, headers=headers, timeout=timeout, stream=stream)
+                if response.status_code in RETRY_STATUSES:
+                    response.raise_for_status()
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                    requests.exceptions.HTTPError) as e:
+                self._failure(d, failure_reason(e), time.monotonic() - t0)
+                if response is not None:
+                    response.close()
+                if attempt == self.max_attempts - 1:
+                    raise
+                with d.lock:
+                    d.stats["retries"] += 1
+                delay = retry_after(response)
+                self.sleep(delay if delay is not None else backoff_delay(attempt))
+                continue
+            # les autres codes (404...) concernent la page, pas la santé du domaine
+            self._success(d, time.monotonic() - t0)
+            return response
+
+    def stats(self):
+        with self._lock:
+            domains = dict(self._domains)
+        result = {}
+        for domain, d in domains.items():
+            with d.lock:
+                s = dict(d.stats, errors=dict(d.stats["errors"]), aborted=dict(d.stats["aborted"]))
+            latency_total = s.pop("latency_total")
+            s["avg_latency"] = round(latency_total / s["requests"], 3) if s["requests"] else 0.0
+            s["max_latency"] = round(s["max_latency"], 3)
+            result[domain] = s
+        return result
@@ -1,29 +1,20 @@
 import os
-from functions import (
-    extract_article, read_links,
-     save_json
-)
+from functions import read_links, report_duplicate_links
+from async_fetch import scrape_links
+from manifest import FetchManifest
 
 LINKS_FILE = "./data/gaza_links.txt"
 OUTPUT_DIR = "./data/raw/gaza"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def main_gaza():
+def main_gaza(refresh=False):
+    # variantes d'un même lien (suivi, AMP, www...) téléchargées une seule fois
+    manifest = FetchManifest()
+    report_duplicate_links(LINKS_FILE)
     links = read_links(LINKS_FILE)
     print(f"[INFO] Found {len(links)} Gaza links")
-    statistics = {"total": len(links), "successful": 0, "failed": 0, "details": {}}
-    for url in links:
-        article = extract_article(url, LINKS_FILE)
-        if article:
-            save_json(article, OUTPUT_DIR)
-            statistics["successful"] += 1
-            media = article["media"]
-            if media in statistics["details"]:
-                statistics["details"][media] += 1
-            else:
-                 statistics["details"][media] = 1
-        else:
-            statistics["failed"] += 1
+    statistics = scrape_links(links, LINKS_FILE, OUTPUT_DIR, manifest=manifest,
+                              category="gaza", refresh=refresh)
     print(f"[INFO] Scraping completed. Successful:",statistics)
     return statistics   
 
@@ -0,0 +1,266 @@
+# Pipeline en flux : téléchargement -> extraction -> normalisation/prétraitement.
+#
+# Les trois étapes tournent en même temps, reliées par des files bornées :
+# un article est écrit dans data/raw, data/raw_text et data/processed_clean
+# quelques instants après son téléchargement, au lieu de trois passes
+# successives sur le disque (scraping, build_corpus, clean_corpus). Les trois
+# niveaux sont des stores compressés (src/common/corpus_store.py).
+#
+#   python src/scraping/build_corpus.py --stream
+import os
+import sys
+import json
+import time
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../preprocessing")))
+
+import functions
+from functions import fetch_page, parse_article, finish_article, get_domain, configure_sessions, open_store
+from async_fetch import (
+    new_statistics, store_result, select_links, finish_run, run_coroutine,
+    MAX_CONCURRENCY, PER_DOMAIN_CONCURRENCY
+)
+from http_cache import HttpCache
+from link_ledger import LinkLedger
+from manifest import FetchManifest
+from resilience import DomainHealth
+from html_archive import HTML_ARCHIVE_DIR, compact_archive
+from token_corpus import ensure_token_corpus, TOKEN_CORPUS_DIR
+import build_corpus
+import scrape_gaza
+import scrape_ukrain
+
+PROCESSED_BASE = "data/processed_clean"
+QUEUE_SIZE = 64
+
+CATEGORIES = {
+    "gaza": (scrape_gaza.LINKS_FILE, scrape_gaza.OUTPUT_DIR),
+    "ukraine": (scrape_ukrain.LINKS_FILE, scrape_ukrain.OUTPUT_DIR),
+}
+
+
+def _preprocess(text):
+    # exécuté dans un processus du pool : import local pour que seuls les
+    # workers chargent NLTK
+    from pipeline import preprocess_to_string
+    return preprocess_to_string(text)
+
+
+class _CategorySink:
+    # état d'écriture d'une catégorie (mêmes règles que build_corpus.process_category)
+    def __init__(self, cat, links_file, raw_dir):
+        self.cat = cat
+        self.links_file = links_file
+        self.raw_dir = raw_dir
+        self.out_dir = os.path.join(build_corpus.OUT_BASE, cat)
+        self.processed_dir = os.path.join(PROCESSED_BASE, cat)
+        self.raw_store = open_store(raw_dir)
+        self.processed_store = open_store(self.processed_dir)
+        build_corpus.remove_legacy_texts(self.out_dir)
+        build_corpus.remove_legacy_texts(self.processed_dir)
+        previous = build_corpus.load_previous_stats(self.out_dir)
+        self.files_state = previous.get("files", {}) if previous else {}
+        self.seen_hashes = {st["sha1"] for st in self.files_state.values() if st["status"] == "saved"}
+        self.statistics = None
+
+    def save_raw_text(self, article_id, obj):
+        old = self.files_state.get(article_id)
+        if old and old["status"] == "saved":
+            self.seen_hashes.discard(old["sha1"])
+            build_corpus.remove_output(self.out_dir, old)
+        st = {"version": self.raw_store.doc_version(article_id), "sha1": None, "words": 0}
+        self.files_state[article_id] = st
+        text = build_corpus.process_raw_article(obj, article_id, st, self.out_dir, self.seen_hashes, set())
+        return text, st
+
+    def save_processed(self, doc_id, processed):
+        if processed:
+            self.processed_store.put(doc_id, {"id": doc_id, "text": processed})
+        else:
+            print(f"[WARNING] No tokens after preprocessing: {doc_id}")
+
+    def backfill_processed(self, kept, workers):
+        # articles gardés sans texte prétraité : prétraitement en échec
+        # pendant le flux, doublon réexaminé ou ancien quasi-doublon redevenu
+        # unique. Traités comme le ferait clean_corpus
+        from clean_corpus import preprocess_records
+        missing = [doc_id for doc_id in sorted(kept) if doc_id not in self.processed_store]
+        if not missing:
+            return 0
+        print(f"[INFO] {self.cat}: preprocessing {len(missing)} saved articles missing from {self.processed_dir}")
+        raw_text = open_store(self.out_dir)
+        jobs = ((doc_id, raw_text.get(doc_id)["text"]) for doc_id in missing)
+        failed = 0
+        for doc_id, processed, error in preprocess_records(jobs, workers):
+            if error is not None:
+                failed += 1
+                print(f"[ERROR] Failed to preprocess {self.cat}/{doc_id}: {error}")
+            else:
+                self.save_processed(doc_id, processed)
+        return failed
+
+    def save_stats(self):
+        stats = build_corpus.summarize(self.files_state)
+        stats["files"] = self.files_state
+        with open(os.path.join(self.out_dir, "_stats.json"), "w") as f:
+            json.dump(stats, f, indent=2)
+
+
+async def _stream(jobs, sinks, cache, ledger, health, archive, manifest, fetch_workers, per_domain,
+                  cpu_workers, queue_size):
+    loop = asyncio.get_running_loop()
+    html_q = asyncio.Queue(maxsize=queue_size)
+    text_q = asyncio.Queue(maxsize=queue_size)
+    domain_sems = defaultdict(lambda: asyncio.Semaphore(per_domain))
+    url_iter = iter(jobs)
+    timings = defaultdict(float)
+    latencies = []
+
+    if per_domain > functions.POOL_MAXSIZE:
+        configure_sessions(pool_maxsize=per_domain)
+
+    async def fetcher():
+        for cat, url in url_iter:
+            sink = sinks[cat]
+            async with domain_sems[get_domain(url)]:
+                t0 = time.perf_counter()
+                page = await loop.run_in_executor(io_pool, fetch_page, url, sink.links_file,
+                                                  cache, ledger, health, archive)
+                timings["fetch"] += time.perf_counter() - t0
+            if not page:
+                # échec (None) ou page abandonnée (SkippedPage)
+                store_result(sink.statistics, url, page, sink.raw_dir, manifest, cat)
+                continue
+            # bloque si l'extraction est en retard : la file reste bornée
+            await html_q.put((cat, url, page, time.perf_counter()))
+
+    async def extractor():
+        while True:
+            item = await html_q.get()
+            if item is None:
+                break
+            cat, url, (response, html, cached), fetched_at = item
+            sink = sinks[cat]
+            # une erreur sur une page ne doit pas arrêter l'extracteur : la
+            # file est bornée, les fetchers resteraient bloqués
+            try:
+                if cached is not None:
+                    article = cached
+                else:
+                    t0 = time.perf_counter()
+                    article = await loop.run_in_executor(cpu_pool, parse_article, url, html)
+                    timings["extract"] += time.perf_counter() - t0
+                    article = finish_article(url, sink.links_file, response, article, cache, ledger)
+                written = store_result(sink.statistics, url, article, sink.raw_dir, manifest, cat)
+            except Exception as e:
+                print(f"[UNEXPECTED ERROR] {url}: {e}")
+                store_result(sink.statistics, url, None, sink.raw_dir, manifest, cat)
+                continue
+            # article inchangé depuis le dernier run : déjà traité
+            if written is not None:
+                await text_q.put((cat, written, article, fetched_at))
+
+    async def processor():
+        while True:
+            item = await text_q.get()
+            if item is None:
+                break
+            cat, article_id, article, fetched_at = item
+            sink = sinks[cat]
+            text, st = sink.save_raw_text(article_id, article)
+            if text is None:
+                continue
+            t0 = time.perf_counter()
+            try:
+                processed = await loop.run_in_executor(cpu_pool, _preprocess, text)
+            except Exception as e:
+                # repris par backfill_processed en fin de run
+                print(f"[ERROR] Failed to preprocess {article_id}, retrying after the run: {e}")
+                continue
+            timings["preprocess"] += time.perf_counter() - t0
+            sink.save_processed(st["id"], processed)
+            latencies.append(time.perf_counter() - fetched_at)
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as io_pool, \
+            ProcessPoolExecutor(max_workers=cpu_workers) as cpu_pool:
+        n_cpu = cpu_workers or os.cpu_count() or 1
+        extractors = [asyncio.ensure_future(extractor()) for _ in range(n_cpu)]
+        processors = [asyncio.ensure_future(processor()) for _ in range(n_cpu)]
+        await asyncio.gather(*[fetcher() for _ in range(fetch_workers)])
+        for _ in extractors:
+            await html_q.put(None)
+        await asyncio.gather(*extractors)
+        for _ in processors:
+            await text_q.put(None)
+        await asyncio.gather(*processors)
+
+    return {
+        # temps cumulé passé dans chaque étape (tous workers confondus)
+        "stage_seconds": {k: round(v, 2) for k, v in timings.items()},
+        "processed": len(latencies),
+        "avg_latency_seconds": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "max_latency_seconds": round(max(latencies), 2) if latencies else 0.0,
+    }
+
+
+def run_stream(refresh=False, fetch_workers=MAX_CONCURRENCY, per_domain=PER_DOMAIN_CONCURRENCY,
+               cpu_workers=None, queue_size=QUEUE_SIZE):
+    cache = HttpCache()
+    ledger = LinkLedger()
+    health = DomainHealth()
+    archive = open_store(HTML_ARCHIVE_DIR)
+    manifest = FetchManifest()
+    for cat in CATEGORIES:
+        build_corpus.migrate_legacy_ids(cat, manifest)
+
+    sinks = {}
+    jobs = []
+    cross = functions.find_cross_category({cat: links_file for cat, (links_file, _) in CATEGORIES.items()})
+    for cat, (links_file, raw_dir) in CATEGORIES.items():
+        functions.report_duplicate_links(links_file)
+        links = functions.read_links(links_file)
+        sink = _CategorySink(cat, links_file, raw_dir)
+        sink.statistics = new_statistics(len(links))
+        todo = select_links(links, raw_dir, manifest, refresh)
+        sink.statistics["skipped"] = len(links) - len(todo)
+        print(f"[INFO] {cat}: {len(links)} links, {len(todo)} to fetch")
+        sinks[cat] = sink
+        jobs.extend((cat, url) for url in todo)
+
+    t0 = time.perf_counter()
+    pipeline_stats = run_coroutine(_stream(jobs, sinks, cache, ledger, health, archive, manifest, fetch_workers,
+                                  per_domain, cpu_workers, queue_size))
+    pipeline_stats["wall_seconds"] = round(time.perf_counter() - t0, 2)
+
+    overall = {}
+    for cat, sink in sinks.items():
+        sink.save_stats()
+        overall[cat] = finish_run(sink.statistics, sink.links_file, None, None, ledger)
+    cache.save()
+    manifest.save()
+    compact_archive(archive)
+
+    # les quasi-doublons ne sont connus qu'une fois tout le corpus présent :
+    # process_category ne retraite que les fichiers dont le statut change
+    clusters, drop = build_corpus.detect_near_duplicates(categories=tuple(CATEGORIES))
+    for cat, sink in sinks.items():
+        stats = build_corpus.process_category(cat, near_dups=drop[cat], near_dup_clusters=clusters)
+        kept = {st["id"] for st in stats["files"].values() if st["status"] == "saved"}
+        for doc_id in sink.processed_store.ids():
+            if doc_id not in kept:
+                sink.processed_store.delete(doc_id)
+        overall[cat]["preprocess_failed"] = sink.backfill_processed(kept, cpu_workers or os.cpu_count() or 1)
+        sink.processed_store.flush()
+        # corpus compilé lu par les analyses (comme après clean_corpus)
+        ensure_token_corpus(sink.processed_dir, os.path.join(TOKEN_CORPUS_DIR, cat))
+
+    overall["cross_category_links"] = cross
+    overall["cache"] = cache.stats()
+    # un seul DomainHealth pour les deux catégories : santé des domaines à part
+    overall["domains"] = health.stats()
+    overall["pipeline"] = pipeline_stats
+    print(f"[INFO] Streaming pipeline: {pipeline_stats}")
+    return overall
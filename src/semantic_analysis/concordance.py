@@ -2,6 +2,32 @@
 from typing import Dict, List
 from pathlib import Path
 import csv
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+from token_corpus import TokenCorpus
+
+def _concordances_ids(corpus: TokenCorpus, keyword: str, window: int, max_lines: int):
+    # positions du mot-clé trouvées sur les ids ; seules les fenêtres sont décodées
+    rows = []
+    keyword_id = corpus.word_id(keyword)
+    if keyword_id is None:
+        return rows
+    for doc_id, ids in corpus.iter_ids():
+        for i in np.flatnonzero(ids == keyword_id).tolist():
+            rows.append({
+                "doc_id": doc_id,
+                "left": " ".join(corpus.decode(ids[max(0, i-window):i])),
+                "keyword": keyword,
+                "right": " ".join(corpus.decode(ids[i+1:i+1+window]))
+            })
+            if len(rows) >= max_lines:
+                return rows
+    return rows
 
 def extract_concordances(
     docs: Dict[str, str],
@@ -10,6 +36,9 @@ def extract_concordances(
     max_lines: int = 200
 ):
 
+    if isinstance(docs, TokenCorpus):
+        return _concordances_ids(docs, keyword, window, max_lines)
+
     rows = []
     for doc_id, text in docs.items():
         tokens = text.split()
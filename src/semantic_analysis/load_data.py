@@ -3,30 +3,39 @@ from typing import Dict, Tuple, List
 import json
 import csv
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+from corpus_store import read_texts
+from token_corpus import load_token_corpora
 
 def load_corpus_texts(base_dir: str, max_docs_per_category=None) -> Dict[str, Dict[str, str]]:
 
     base = Path(base_dir)
     corpora = {}
+    # corpus compilé par clean_corpus (ids de tokens en mmap), s'il est à jour
+    compiled = load_token_corpora(base_dir, min_tokens=50, limit=max_docs_per_category)
     
     for cat in ("gaza", "ukraine"):
+        if cat in compiled:
+            corpora[cat] = compiled[cat]
+            print(f"[INFO] Loaded {len(compiled[cat])} documents for {cat} (token corpus)")
+            continue
         cat_dir = base / cat
         docs = {}
         if cat_dir.exists():
-            files = sorted(cat_dir.glob("*.txt"))
-            if max_docs_per_category:
-                files = files[:max_docs_per_category]
-            
-            for p in files:
-                doc_id = p.stem
-                try:
-                    text = p.read_text(encoding="utf-8")
+            # store compressé (ou dossier de .txt de l'ancien format) ;
+            # read_texts saute un document illisible, pas toute la catégorie.
+            # Le try ne couvre plus que les erreurs du store lui-même
+            try:
+                for doc_id, text in read_texts(str(cat_dir), max_docs_per_category):
                     # Skip empty or very short documents
                     if len(text.split()) < 50:
                         continue
                     docs[doc_id] = text
-                except Exception as e:
-                    print(f"[ERROR] Failed to load {p}: {e}")
+            except Exception as e:
+                print(f"[ERROR] Failed to open {cat_dir}: {e}")
                     
         print(f"[INFO] Loaded {len(docs)} documents for {cat}")
         corpora[cat] = docs
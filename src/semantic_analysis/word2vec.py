@@ -2,17 +2,27 @@
 from gensim.models import Word2Vec
 from pathlib import Path
 import csv
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+
+from token_corpus import TokenCorpus
 
 def train_word2vec(docs: dict,
                    vector_size=200,
                    window=5,
                    min_count=5,
                    workers=4):
-    sentences = []
-    for txt in docs.values():
-        tokens = txt.split()
-        if len(tokens) > 5:
-            sentences.append(tokens)
+    if isinstance(docs, TokenCorpus):
+        # documents décodés au fil des époques, sans liste en mémoire
+        sentences = docs.sentences(min_tokens=6)
+    else:
+        sentences = []
+        for txt in docs.values():
+            tokens = txt.split()
+            if len(tokens) > 5:
+                sentences.append(tokens)
 
     model = Word2Vec(
         sentences=sentences,
@@ -1,10 +1,10 @@
 # src/sentiment_analysis/actor_sentiment.py
-from nltk.sentiment import SentimentIntensityAnalyzer
-import nltk
+import os
+import sys
 
-nltk.download("vader_lexicon")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
 
-sia = SentimentIntensityAnalyzer()
+from nltk_resources import sentiment_analyzer
 
 ACTORS = {
     "israel": ["israel", "idf"],
@@ -16,6 +16,7 @@ ACTORS = {
 
 def extract_actor_sentiment(docs: dict):
     rows = []
+    sia = sentiment_analyzer()
 
     for doc_id, text in docs.items():
         sentences = text.split(".")
@@ -1,12 +1,10 @@
 #src/sentiment/victim_sentiment.py
-from nltk.sentiment import SentimentIntensityAnalyzer
-import nltk
-nltk.download("punkt")
-from nltk.tokenize import sent_tokenize
+import os
+import sys
 
-nltk.download("vader_lexicon")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
 
-sia = SentimentIntensityAnalyzer()
+from nltk_resources import sentiment_analyzer
 
 VICTIM_TERMS = {
     "civilian", "civilians",
@@ -22,6 +20,7 @@ import re
 
 def extract_victim_sentiment(docs: dict, window=25):
     rows = []
+    sia = sentiment_analyzer()
 
     for doc_id, text in docs.items():
         tokens = text.lower().split()
@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 import pickle
 import numpy as np
@@ -15,6 +16,10 @@ from tensorflow.keras.utils import to_categorical
 from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
 from tensorflow.keras import regularizers
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "common")))
+
+from corpus_store import read_texts
+
 # =========================
 # CONFIGURATION
 # =========================
@@ -51,13 +56,12 @@ def load_documents(data_dir):
             continue
         
         count = 0
-        for file in folder.glob("*.txt"):
-            with open(file, "r", encoding="utf-8") as f:
-                content = f.read().strip().lower()  # Lowercase dès le début
-                if content and len(content.split()) > 10:
-                    texts.append(content)
-                    labels.append(label)
-                    count += 1
+        for _, content in read_texts(str(folder)):
+            content = content.strip().lower()  # Lowercase dès le début
+            if content and len(content.split()) > 10:
+                texts.append(content)
+                labels.append(label)
+                count += 1
         
         print(f"✅ Loaded {count} {label} documents")
     